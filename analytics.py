@@ -0,0 +1,161 @@
+"""儀表板共用的統計計算（KPI、維度平均、詞頻）"""
+import re
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# 各維度情感分數欄位
+DIMENSIONS = [
+    'r_sentiment.Staff Service',
+    'r_sentiment.Location',
+    'r_sentiment.Room & Bathroom Quality',
+    'r_sentiment.Environment',
+    'r_sentiment.Facilities',
+    'r_sentiment.Food & Beverage',
+    'r_sentiment.Value'
+]
+
+DIMENSION_NAMES = [
+    '員工服務',
+    '地點位置',
+    '房間浴室品質',
+    '環境',
+    '設施',
+    '餐飲',
+    '性價比'
+]
+
+# 情感代碼對應的標籤
+SENTIMENT_LABELS = {-1.0: '負面', 0.0: '中性', 1.0: '正面'}
+
+# 時間快捷選項（不含自訂）
+TIME_PRESETS = ["最近 30 天", "最近 3 個月", "最近 6 個月", "最近 1 年", "今年", "全部"]
+
+# 過濾停用詞（常見但無意義的詞）
+STOP_WORDS = {'的', '了', '和', '是', '在', '有', '我', '就', '不', '也', '都', '這', '那', '要', '會', '可', '能', '但', '很', '還', '沒', '說', '而', '到', '去', '對', '與', '及', '以', '被', '給', '把', '讓', '為', '從', '向', '於', '比', '讓我', '我們', '你們', '他們', '這個', '那個', '什麼', '如果', '因為', '所以', '雖然', '然而', '當然', '可以', '應該', '可能', '一定'}
+
+
+def preset_date_range(preset, min_date, max_date):
+    """時間快捷選項對應的 (開始日, 結束日)；以資料的最後日期為基準，而不是今天"""
+    days = {"最近 30 天": 30, "最近 3 個月": 90, "最近 6 個月": 180, "最近 1 年": 365}
+    if preset in days:
+        return max(max_date - timedelta(days=days[preset]), min_date), max_date
+    if preset == "今年":
+        # 使用數據最後日期的年份
+        return max(date(max_date.year, 1, 1), min_date), max_date
+    if preset == "全部":
+        return min_date, max_date
+    raise ValueError(f"未知的時間快捷選項: {preset}")
+
+
+def filter_mask(df, start_date, end_date, stars, sentiments, collapse_duplicates=False, repeat_reviewers=None):
+    """依日期範圍、星級與情感產生篩選遮罩（日期直接以 datetime64 比較，不轉成 Python date）"""
+    mask = (
+        (df['date'] >= pd.Timestamp(start_date)) &
+        (df['date'] < pd.Timestamp(end_date) + pd.Timedelta(days=1)) &
+        (df['star'].isin(stars)) &
+        (df['sentiment'].isin(sentiments))
+    )
+    # 重複評論者：'only' 只看、'exclude' 排除
+    if repeat_reviewers == 'only':
+        mask &= df['reviewer_count'] > 1
+    elif repeat_reviewers == 'exclude':
+        mask &= df['reviewer_count'] <= 1
+    # 合併近似重複評論：在符合其他條件的評論中，每個群組只保留日期最早的一則
+    if collapse_duplicates:
+        mask &= ~later_duplicates(df, mask)
+    return mask
+
+
+def later_duplicates(df, mask):
+    """標記遮罩內每個近似重複群組中，日期最早者以外的評論"""
+    clusters = df['dup_cluster'].where(mask)
+    # 只需排序群組成員（大多數評論自成一組）
+    rows = np.flatnonzero(clusters.duplicated(keep=False).to_numpy() & np.asarray(mask))
+    rows = rows[np.argsort(df['date'].to_numpy()[rows], kind='stable')]
+    later = np.zeros(len(df), dtype=bool)
+    later[rows] = clusters.iloc[rows].duplicated().to_numpy()
+    return later
+
+
+def compute_kpis(df):
+    """計算 KPI 指標卡的數值"""
+    total = len(df)
+    positive_pct = (df['sentiment'] == 1.0).sum() / total * 100 if total > 0 else 0
+    negative_pct = (df['sentiment'] == -1.0).sum() / total * 100 if total > 0 else 0
+    return {
+        'total': total,
+        'avg_star': df['star'].mean(),
+        'positive_pct': positive_pct,
+        'negative_pct': negative_pct,
+        'date_span': (df['date'].max() - df['date'].min()).days
+    }
+
+
+def compute_monthly_trend(df):
+    """月度平均星級、平均情感分數與評論數"""
+    monthly_data = df.groupby('year_month').agg({
+        'star': 'mean',
+        'sentiment': 'mean',
+        'text': 'count'
+    }).reset_index()
+    monthly_data.columns = ['年月', '平均星級', '平均情感分數', '評論數']
+    return monthly_data
+
+
+def compute_yearly_trend(df):
+    """年度平均星級、評論數與平均情感分數"""
+    yearly_data = df.groupby('year').agg({
+        'star': 'mean',
+        'text': 'count',
+        'sentiment': 'mean'
+    }).reset_index()
+    yearly_data.columns = ['年份', '平均星級', '評論數', '平均情感分數']
+    return yearly_data
+
+
+def compute_sentiment_trend(df, labels):
+    """每月各情感的評論數與百分比；labels 為 {情感代碼: 標籤}"""
+    sentiment_time = df.groupby(['year_month', 'sentiment']).size().reset_index(name='count')
+
+    # 計算每個月的總數和百分比
+    total_by_month = sentiment_time.groupby('year_month')['count'].sum().reset_index()
+    total_by_month.columns = ['year_month', 'total']
+    sentiment_time = sentiment_time.merge(total_by_month, on='year_month')
+    sentiment_time['percentage'] = (sentiment_time['count'] / sentiment_time['total'] * 100).round(1)
+    sentiment_time['sentiment_label'] = sentiment_time['sentiment'].map(labels)
+    return sentiment_time
+
+
+def compute_dimension_averages(df):
+    """各維度平均情感分數（依分數由低到高排序）"""
+    return pd.DataFrame({
+        '維度': DIMENSION_NAMES,
+        '平均分數': [df[dim].mean() for dim in DIMENSIONS]
+    }).sort_values('平均分數', ascending=True)
+
+
+def extract_words(text):
+    """擷取 2-4 個字的詞（中文分詞需要 jieba，這裡先用簡單的字詞統計）"""
+    # 移除標點符號和數字
+    text_cleaned = re.sub(r'[^\w\s]', ' ', text)
+    text_cleaned = re.sub(r'\d+', '', text_cleaned)
+
+    words = []
+    for length in [2, 3, 4]:
+        for i in range(len(text_cleaned) - length + 1):
+            word = text_cleaned[i:i+length]
+            if word.strip() and not word.isspace():
+                words.append(word.strip())
+    return words
+
+
+def compute_word_freq(texts, min_count=3, top_n=30):
+    """逐則評論擷取詞彙後加總（不產生跨評論的詞），回傳 {詞彙: 出現次數}"""
+    word_freq = Counter()
+    for text in texts.dropna().astype(str):
+        word_freq.update(extract_words(text))
+    word_freq = {k: v for k, v in word_freq.items() if k not in STOP_WORDS and v >= min_count}
+    return dict(sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:top_n])
@@ -0,0 +1,242 @@
+"""本機 JSON 彙總 API：提供與儀表板相同的 KPI、月度趨勢、維度平均與高頻詞
+
+執行方式：
+    python api_server.py --port 8502 --workers 8
+
+端點（皆支援 ETag / If-None-Match）：
+    GET /api/version
+    GET /api/kpis?start=2023-01-01&end=2023-12-31&stars=4,5&sentiments=1,0
+    GET /api/monthly?...
+    GET /api/dimensions?...
+    GET /api/keywords?...&keyword_sentiment=負面
+    （加上 dedup=1 可合併近似重複評論；repeat=only / exclude 只看或排除重複評論者；
+    version=<版本代碼> 可固定查詢某個資料版本）
+"""
+import argparse
+import hashlib
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from analytics import (
+    filter_mask,
+    compute_kpis,
+    compute_monthly_trend,
+    compute_dimension_averages,
+    compute_word_freq
+)
+from shared_store import open_shared
+from versions import current_version, list_versions, read_log
+
+KEYWORD_SENTIMENTS = {'正面': 1.0, '中性': 0.0, '負面': -1.0}
+
+_load_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _load_version(version):
+    return open_shared(version)[1]
+
+
+def resolve_version(requested=None):
+    """回傳 (版本, 所有版本代碼)，版本紀錄只讀取一次
+
+    未指定版本時使用來源檔目前的版本；在 _load_lock 內解析，來源檔更新時只有一個執行緒載入。
+    """
+    with _load_lock:
+        records = read_log()
+        version = requested or current_version(records=records)
+        known = [record['version'] for record in list_versions(records)]
+        if version not in known and not requested:
+            # 剛寫入的新版本
+            known = [record['version'] for record in list_versions()]
+        return version, known
+
+
+def load_data(version=None):
+    """回傳 (版本, DataFrame)；未指定版本時使用來源檔目前的版本，檔案更新後自動重新載入"""
+    with _load_lock:
+        version = version or current_version()
+        return version, _load_version(version)
+
+
+def parse_filter(query):
+    """將查詢參數轉成標準化的篩選條件 tuple（可作為快取鍵）"""
+    def values(name, cast):
+        raw = query.get(name, [''])[0]
+        return tuple(sorted(cast(v) for v in raw.split(',') if v.strip())) or None
+
+    start = query.get('start', [None])[0]
+    end = query.get('end', [None])[0]
+    keyword_sentiment = query.get('keyword_sentiment', ['全部'])[0]
+    collapse_duplicates = query.get('dedup', ['0'])[0] in ('1', 'true')
+    repeat_reviewers = query.get('repeat', [None])[0]
+    if repeat_reviewers not in (None, 'only', 'exclude'):
+        raise ValueError(f"未知的 repeat: {repeat_reviewers}")
+    if keyword_sentiment not in KEYWORD_SENTIMENTS and keyword_sentiment != '全部':
+        raise ValueError(f"未知的 keyword_sentiment: {keyword_sentiment}")
+    return (
+        date.fromisoformat(start) if start else None,
+        date.fromisoformat(end) if end else None,
+        values('stars', float),
+        values('sentiments', float),
+        keyword_sentiment,
+        collapse_duplicates,
+        repeat_reviewers
+    )
+
+
+def _filtered(df, spec):
+    start, end, stars, sentiments, _, collapse_duplicates, repeat_reviewers = spec
+    return df[filter_mask(
+        df,
+        start or df['date'].min().date(),
+        end or df['date'].max().date(),
+        stars or df['star'].dropna().unique(),
+        sentiments or (-1.0, 0.0, 1.0),
+        collapse_duplicates,
+        repeat_reviewers
+    )]
+
+
+def _clean(value):
+    """NaN 轉為 null，numpy 數值轉為 Python 型別"""
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clean(v) for v in value]
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+@lru_cache(maxsize=256)
+def aggregate(version, endpoint, spec):
+    """計算指定端點的彙總結果（依 資料版本 + 篩選條件 快取）"""
+    _, df = load_data(version)
+    filtered_df = _filtered(df, spec)
+
+    if endpoint == 'kpis':
+        result = compute_kpis(filtered_df)
+    elif endpoint == 'monthly':
+        result = compute_monthly_trend(filtered_df).to_dict(orient='records')
+    elif endpoint == 'dimensions':
+        result = compute_dimension_averages(filtered_df).to_dict(orient='records')
+    else:
+        keyword_sentiment = spec[4]
+        if keyword_sentiment in KEYWORD_SENTIMENTS:
+            filtered_df = filtered_df[filtered_df['sentiment'] == KEYWORD_SENTIMENTS[keyword_sentiment]]
+        result = [
+            {'詞彙': word, '出現次數': count}
+            for word, count in compute_word_freq(filtered_df['text']).items()
+        ]
+
+    body = json.dumps({'version': version, 'data': _clean(result)}, ensure_ascii=False)
+    return body.encode('utf-8')
+
+
+def make_etag(version, endpoint, spec):
+    key = json.dumps([version, endpoint, [str(v) for v in spec]], ensure_ascii=False)
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
+
+
+class AggregateHandler(BaseHTTPRequestHandler):
+    ENDPOINTS = ('kpis', 'monthly', 'dimensions', 'keywords')
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'api':
+            return self._send_json(404, {'error': '找不到端點'})
+
+        endpoint = parts[1]
+        query = parse_qs(url.query)
+        version, known = resolve_version(query.get('version', [None])[0])
+        if version not in known:
+            return self._send_json(404, {'error': f"未知的資料版本: {version}"})
+        if endpoint == 'version':
+            return self._send_json(200, {'version': version, 'versions': known})
+        if endpoint not in self.ENDPOINTS:
+            return self._send_json(404, {'error': f"未知的端點: {endpoint}"})
+
+        try:
+            spec = parse_filter(query)
+        except ValueError as e:
+            return self._send_json(400, {'error': str(e)})
+
+        etag = make_etag(version, endpoint, spec)
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        body = aggregate(version, endpoint, spec)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PooledHTTPServer(HTTPServer):
+    """以固定大小的執行緒池處理請求"""
+
+    def __init__(self, address, handler, workers):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='W Hotel 評價彙總 JSON API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    # 預先載入資料，避免第一個請求等待
+    load_data()
+    server = PooledHTTPServer((args.host, args.port), AggregateHandler, args.workers)
+    print(f"API 服務啟動於 http://{args.host}:{args.port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,60 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
 
+from analytics import (
+    filter_mask,
+    compute_kpis,
+    compute_monthly_trend,
+    compute_yearly_trend,
+    compute_sentiment_trend,
+    compute_dimension_averages,
+    compute_word_freq,
+    preset_date_range,
+    DIMENSIONS,
+    DIMENSION_NAMES,
+    SENTIMENT_LABELS,
+    TIME_PRESETS
+)
+from charts import (
+    monthly_trend_figure,
+    yearly_trend_figure,
+    sentiment_trend_figure,
+    dimension_figure,
+    radar_figure,
+    word_freq_figure,
+    star_distribution_figure,
+    sentiment_distribution_figure
+)
+from shared_store import open_shared, open_shared_arrays
+from versions import current_version, list_versions, diff_versions
+from validation import load_report, quarantine_paths
+from similarity import build_similarity_arrays, find_similar, similarity_index_from_arrays
+from drivers import build_driver_stats, cell_mask, driver_analysis
+from phrases import build_phrase_arrays, phrase_counts_from_arrays, top_phrases
+from sections import SectionTasks, create_pool
+from snapshots import build_snapshots, load_snapshot, snapshot_path
+from reviewers import (
+    build_reviewer_index,
+    reviewer_positions,
+    top_repeat_reviewers,
+    reviewer_dimension_trend
+)
+from sampling import (
+    APPROX_MIN_ROWS,
+    build_stratified_sample,
+    estimate_domain_size,
+    approx_kpis,
+    approx_dimension_averages,
+    approx_word_freq
+)
+
 # 頁面配置
 st.set_page_config(
     page_title="W Hotel 客戶評價分析儀表板",
@@ -121,23 +171,84 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 載入數據
-@st.cache_data
-def load_data():
-    df = pd.read_excel('chat_W_hotel.xlsx')
-    df['date'] = pd.to_datetime(df['date'])
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    df['year_month'] = df['date'].dt.to_period('M').astype(str)
-    return df
+# 各快取以資料版本為鍵：來源檔更新只會產生新的快取項目，不需要整個清除；
+# 同時保留的版本數 = 可同時檢視的不同版本數（最新版本加上各工作階段固定的舊版本），
+# 版本比較另外快取，不佔用這些項目
+VERSION_CACHE_ENTRIES = 5
+# 相似評論檢索的選單最多列出的評論數
+SIMILAR_PICKER_ROWS = 50
+
+# 載入數據（各程序以唯讀 mmap 共用同一份 Arrow 檔，用 cache_resource 避免每個工作階段複製）
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def load_data(version):
+    return open_shared(version)[1]
+
+# 預先建立分層樣本（近似模式使用）
+@st.cache_data(max_entries=VERSION_CACHE_ENTRIES)
+def load_sample(version):
+    return build_stratified_sample(load_data(version))
+
+# 預先建立 TF-IDF 相似度索引（相似評論檢索使用；矩陣存於 .data_cache 並以 mmap 共用）
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def load_similarity_index(version):
+    return similarity_index_from_arrays(open_shared_arrays(version, 'similarity', build_similarity_arrays))
+
+# 驅動因素分析的分格充分統計量
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def load_driver_stats(version):
+    return build_driver_stats(load_data(version))
+
+# 各維度 reasons.* 片語的分格計數（維度深入分析使用；計數表存於 .data_cache 並以 mmap 共用）
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def load_phrase_counts(version):
+    return phrase_counts_from_arrays(open_shared_arrays(version, 'phrases', build_phrase_arrays))
+
+# 評論者索引（姓名雜湊 -> 列位置）
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def load_reviewer_index(version):
+    return build_reviewer_index(load_data(version))
+
+# 兩個版本之間新增、移除與修改的列，以及兩者在相同篩選下的 KPI
+# （直接開啟共用資料集，不經過 load_data，避免擠掉正在檢視的版本的索引快取）
+@st.cache_data(max_entries=VERSION_CACHE_ENTRIES)
+def load_version_comparison(old_version, new_version, filters):
+    kpis = []
+    for version in (old_version, new_version):
+        version_df = open_shared(version)[1]
+        kpis.append(compute_kpis(version_df[filter_mask(version_df, *filters)]))
+    return diff_versions(old_version, new_version), kpis[0], kpis[1]
+
+# 區塊平行計算用的執行緒池（所有工作階段共用）
+@st.cache_resource
+def load_section_pool():
+    return create_pool()
+
+# 靜態快照專用的單一背景執行緒：產生快照耗時且佔用 GIL，不與各工作階段的區塊計算共用執行緒池
+@st.cache_resource
+def load_snapshot_pool():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshot')
+
+def _log_snapshot_failure(future):
+    if future.exception() is not None:
+        logging.getLogger(__name__).error("產生靜態快照失敗", exc_info=future.exception())
+
+# 每個資料版本只在背景產生一次靜態快照（不阻塞目前的頁面）；在執行緒中逐一產生，不在伺服器中 fork
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def start_snapshot_build(version):
+    future = load_snapshot_pool().submit(build_snapshots, version)
+    future.add_done_callback(_log_snapshot_failure)
+    return future
+
+# 快照內嵌的 KPI 與圖表 JSON（快照檔產生後不再變動）
+@st.cache_data(max_entries=len(TIME_PRESETS) * VERSION_CACHE_ENTRIES)
+def load_cached_snapshot(version, preset):
+    return load_snapshot(version, preset)
 
 # 主標題
 st.markdown('<h1 class="main-header">🏨 W Hotel 客戶評價分析儀表板</h1>', unsafe_allow_html=True)
 
 # 載入數據
 try:
-    df = load_data()
-
     # 側邊欄快速導航
     st.sidebar.header("🧭 快速導航")
     st.sidebar.markdown("""
@@ -170,15 +281,46 @@ try:
     <a href="#trend" class="nav-link">📈 評價趨勢</a>
     <a href="#dimension-overview" class="nav-link">🎯 維度總覽</a>
     <a href="#dimension-compare" class="nav-link">🔀 維度比較 ✨</a>
+    <a href="#drivers" class="nav-link">🧭 驅動因素分析</a>
     <a href="#wordcloud" class="nav-link">☁️ 關鍵詞雲 ✨</a>
     <a href="#distribution" class="nav-link">📊 評價分布</a>
     <a href="#drill-down" class="nav-link nav-link-highlight">🔍 維度深入分析 ⭐</a>
+    <a href="#reviewers" class="nav-link">👥 評論者分析</a>
     <a href="#reviews" class="nav-link">💬 評論瀏覽</a>
+    <a href="#versions" class="nav-link">🕓 版本比較</a>
     <a href="#download" class="nav-link">📥 資料下載</a>
     """, unsafe_allow_html=True)
 
     st.sidebar.markdown("---")
 
+    # 資料版本：預設為來源檔目前的版本，可固定於舊版本（網址帶 ?version= 可分享同一個畫面）
+    latest_version = current_version()
+    version_records = {record['version']: record for record in list_versions()}
+    version_options = list(version_records)
+
+    def version_label(version):
+        record = version_records[version]
+        label = f"{version}（{record['created'][:16].replace('T', ' ')}，{record['rows']:,} 筆）"
+        return label + ' · 最新' if version == latest_version else label
+
+    pinned_version = st.query_params.get('version')
+    data_version = st.sidebar.selectbox(
+        "📚 資料版本",
+        options=version_options,
+        index=version_options.index(pinned_version if pinned_version in version_records else latest_version),
+        format_func=version_label,
+        help="每次來源檔更新都會保存一個不可變的版本，可固定於舊版本重現當時的儀表板"
+    )
+    if data_version != latest_version:
+        st.query_params['version'] = data_version
+        st.sidebar.caption("📌 已固定於舊版本，來源檔更新不會影響此畫面")
+    elif 'version' in st.query_params:
+        del st.query_params['version']
+
+    df = load_data(data_version)
+
+    st.sidebar.markdown("---")
+
     # 側邊欄篩選器
     st.sidebar.header("📊 數據篩選")
 
@@ -190,33 +332,13 @@ try:
     st.sidebar.markdown("**⏰ 時間快捷選擇**")
     time_preset = st.sidebar.radio(
         "選擇時間範圍",
-        options=["自訂", "最近 30 天", "最近 3 個月", "最近 6 個月", "最近 1 年", "今年", "全部"],
+        options=["自訂"] + TIME_PRESETS,
         horizontal=False,
         label_visibility="collapsed"
     )
 
-    from datetime import timedelta
-
-    # 使用數據的最後日期而不是今天
-    if time_preset == "最近 30 天":
-        start_date = max(max_date - timedelta(days=30), min_date)
-        end_date = max_date
-    elif time_preset == "最近 3 個月":
-        start_date = max(max_date - timedelta(days=90), min_date)
-        end_date = max_date
-    elif time_preset == "最近 6 個月":
-        start_date = max(max_date - timedelta(days=180), min_date)
-        end_date = max_date
-    elif time_preset == "最近 1 年":
-        start_date = max(max_date - timedelta(days=365), min_date)
-        end_date = max_date
-    elif time_preset == "今年":
-        # 使用數據最後日期的年份
-        start_date = max(datetime(max_date.year, 1, 1).date(), min_date)
-        end_date = max_date
-    elif time_preset == "全部":
-        start_date = min_date
-        end_date = max_date
+    if time_preset in TIME_PRESETS:
+        start_date, end_date = preset_date_range(time_preset, min_date, max_date)
     else:  # 自訂
         date_range = st.sidebar.date_input(
             "自訂日期範圍",
@@ -238,7 +360,7 @@ try:
     )
 
     # 情感篩選
-    sentiment_map = {-1.0: '負面', 0.0: '中性', 1.0: '正面'}
+    sentiment_map = SENTIMENT_LABELS
     selected_sentiments = st.sidebar.multiselect(
         "選擇情感",
         options=list(sentiment_map.values()),
@@ -249,53 +371,273 @@ try:
     sentiment_reverse_map = {'負面': -1.0, '中性': 0.0, '正面': 1.0}
     selected_sentiment_values = [sentiment_reverse_map[s] for s in selected_sentiments]
 
+    # 近似重複評論（轉貼、複製）只計一次
+    collapse_duplicates = st.sidebar.toggle(
+        "🧹 合併重複評論",
+        value=False,
+        help="近似重複的評論只保留最早的一則，所有區塊（KPI、趨勢、詞頻等）皆套用"
+    )
+
+    # 重複評論者篩選
+    repeat_option = st.sidebar.radio(
+        "重複評論者",
+        options=['全部', '只看重複評論者', '排除重複評論者'],
+        horizontal=True
+    )
+    repeat_reviewers = {'只看重複評論者': 'only', '排除重複評論者': 'exclude'}.get(repeat_option)
+
     # 應用篩選
-    filtered_df = df[
-        (df['date'].dt.date >= start_date) &
-        (df['date'].dt.date <= end_date) &
-        (df['star'].isin(selected_stars)) &
-        (df['sentiment'].isin(selected_sentiment_values))
-    ]
+    filtered_df = df[filter_mask(
+        df, start_date, end_date, selected_stars, selected_sentiment_values,
+        collapse_duplicates, repeat_reviewers
+    )]
 
     st.sidebar.markdown(f"**篩選後數據量**: {len(filtered_df)} / {len(df)} 筆")
+    # 載入時的資料驗證結果
+    validation_report = load_report(data_version)
+    if validation_report and validation_report['quarantined'] > 0:
+        with st.sidebar.expander(f"🛡️ 資料驗證：已隔離 {validation_report['quarantined']:,} 筆"):
+            st.caption(f"檢查 {validation_report['rows']:,} 筆，耗時 {validation_report['seconds']:.3f} 秒")
+            rule_df = pd.DataFrame(
+                [(k, v) for k, v in validation_report['rules'].items() if v > 0],
+                columns=['規則', '不合格筆數']
+            )
+            st.dataframe(rule_df, use_container_width=True, hide_index=True)
+            with open(quarantine_paths(data_version)[0], 'rb') as f:
+                st.download_button(
+                    label="下載隔離資料 (CSV)",
+                    data=f.read(),
+                    file_name="w_hotel_reviews_quarantine.csv",
+                    mime="text/csv"
+                )
+    elif validation_report:
+        st.sidebar.caption(f"🛡️ 資料驗證通過（{validation_report['rows']:,} 筆，{validation_report['seconds']:.3f} 秒）")
+
+    if df['scored_locally'].any():
+        st.sidebar.caption(f"其中 {int(df['scored_locally'].sum()):,} 筆的情感分數由本機規則評分")
+    if collapse_duplicates:
+        merged_count = int(filter_mask(
+            df, start_date, end_date, selected_stars, selected_sentiment_values,
+            repeat_reviewers=repeat_reviewers
+        ).sum()) - len(filtered_df)
+        st.sidebar.caption(f"已合併 {merged_count:,} 則近似重複評論")
+
+    # 近似模式：以分層樣本估計 KPI、維度平均與詞頻
+    approx_mode = st.sidebar.toggle(
+        "⚡ 近似模式",
+        value=False,
+        help=f"以 (年月, 星級) 分層樣本快速估計並顯示 95% 信賴區間；篩選後少於 {APPROX_MIN_ROWS:,} 筆時自動改為精確計算"
+    )
+    use_approx = False
+    if approx_mode:
+        sample_df = load_sample(data_version)
+        sample_mask = filter_mask(
+            sample_df, start_date, end_date, selected_stars, selected_sentiment_values,
+            collapse_duplicates, repeat_reviewers
+        ).to_numpy()
+        use_approx = estimate_domain_size(sample_df, sample_mask) >= APPROX_MIN_ROWS
+        if use_approx:
+            st.sidebar.caption(f"⚡ 近似結果（樣本 {int(sample_mask.sum()):,} 筆，± 為 95% 信賴區間）")
+        else:
+            st.sidebar.caption("篩選後數據量較小，已自動使用精確計算")
+
+    # 快照模式：尚未調整篩選條件時直接顯示預先產生的快照，不執行完整的計算流程
+    snapshot_build = start_snapshot_build(data_version)
+    if snapshot_build.done() and snapshot_build.exception() is not None:
+        # 失敗的建置不留在快取中，下一次重新執行時重試
+        start_snapshot_build.clear(data_version)
+        st.sidebar.caption("⚠️ 靜態快照產生失敗，將於下次重新整理時重試")
+    if time_preset in TIME_PRESETS:
+        snapshot_preset = time_preset
+    elif (start_date, end_date) == (min_date, max_date):
+        snapshot_preset = "全部"
+    else:
+        snapshot_preset = None
+    default_filters = (
+        snapshot_preset is not None and
+        len(selected_stars) == len(star_options) and
+        len(selected_sentiment_values) == len(sentiment_map) and
+        not collapse_duplicates and
+        repeat_reviewers is None and
+        not approx_mode
+    )
+    if (
+        default_filters and
+        not st.session_state.get('live_mode', False) and
+        os.path.exists(snapshot_path(data_version, snapshot_preset))
+    ):
+        snapshot = load_cached_snapshot(data_version, snapshot_preset)
+        snapshot_figures = snapshot['figures']
+
+        st.markdown('<a id="kpi"></a>', unsafe_allow_html=True)
+        st.markdown("---")
+        for kpi_col, (kpi_label, kpi_value) in zip(st.columns(5), snapshot['kpis']):
+            with kpi_col:
+                st.metric(label=kpi_label, value=kpi_value)
+        st.markdown("---")
+
+        st.markdown('<a id="trend"></a>', unsafe_allow_html=True)
+        st.subheader("📈 評價趨勢分析")
+        for trend_tab, figure_name in zip(st.tabs(["月度趨勢", "年度趨勢", "情感趨勢"]), ['monthly', 'yearly', 'sentiment_trend']):
+            with trend_tab:
+                st.plotly_chart(snapshot_figures[figure_name], use_container_width=True)
+        st.markdown("---")
+
+        st.markdown('<a id="dimension-overview"></a>', unsafe_allow_html=True)
+        st.subheader("🎯 各維度評分分析")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(snapshot_figures['dimensions'], use_container_width=True)
+        with col2:
+            if 'radar' in snapshot_figures:
+                st.plotly_chart(snapshot_figures['radar'], use_container_width=True)
+            else:
+                st.warning("⚠️ 篩選後沒有足夠的數據顯示雷達圖")
+        st.markdown("---")
+
+        st.markdown('<a id="wordcloud"></a>', unsafe_allow_html=True)
+        st.subheader("☁️ 評論關鍵詞雲")
+        if 'keywords' in snapshot_figures:
+            st.plotly_chart(snapshot_figures['keywords'], use_container_width=True)
+            with st.expander("📋 查看完整詞頻列表"):
+                st.dataframe(pd.DataFrame(snapshot['keywords']), use_container_width=True, hide_index=True)
+        else:
+            st.info("📝 沒有足夠的詞彙數據生成詞頻統計（詞彙至少需出現 3 次）")
+        st.markdown("---")
+
+        st.markdown('<a id="distribution"></a>', unsafe_allow_html=True)
+        st.subheader("📊 評價分布分析")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(snapshot_figures['star_dist'], use_container_width=True)
+        with col2:
+            st.plotly_chart(snapshot_figures['sentiment_dist'], use_container_width=True)
+        st.markdown("---")
+
+        st.info(
+            f"⚡ 以上為預先產生的快照（資料版本 {data_version}，產生於 {snapshot['generated'].replace('T', ' ')}）。"
+            "調整任何篩選條件即會改為即時計算。"
+        )
+        st.button(
+            "🔄 載入完整互動分析（維度比較、驅動因素、深入分析、評論瀏覽等）",
+            on_click=lambda: st.session_state.update(live_mode=True)
+        )
+        st.stop()
+
+    # 各區塊互不相依的計算先一起送出平行執行，下方依頁面順序渲染時再取回結果。
+    # 區塊內的選項（ridge、詞雲情感、深入分析維度）以 key 從上一次的 widget 狀態讀取
+    driver_ridge_value = st.session_state.get('driver_ridge', 0.1)
+    wordcloud_sentiment_value = st.session_state.get('wordcloud_sentiment', '全部')
+    drill_dimension_value = st.session_state.get('drill_dimension', DIMENSION_NAMES[0])
+    drill_sentiment_value = st.session_state.get('dim_sentiment_filter', '全部')
+
+    sections = SectionTasks(load_section_pool())
+    if use_approx:
+        sections.add('kpis', approx_kpis, sample_df, sample_mask)
+        sections.add('dimensions', approx_dimension_averages, sample_df, sample_mask)
+    else:
+        sections.add('kpis', compute_kpis, filtered_df)
+        sections.add('dimensions', compute_dimension_averages, filtered_df)
+    sections.add('monthly', compute_monthly_trend, filtered_df)
+    sections.add('yearly', compute_yearly_trend, filtered_df)
+    sections.add('sentiment_trend', compute_sentiment_trend, filtered_df, sentiment_map)
+
+    driver_stats = load_driver_stats(data_version)
+    driver_cells = cell_mask(
+        driver_stats,
+        start_date.strftime('%Y-%m'),
+        end_date.strftime('%Y-%m'),
+        selected_stars,
+        selected_sentiment_values,
+        collapse_duplicates,
+        repeat_reviewers
+    )
+    sections.add('drivers', driver_analysis, driver_stats, driver_cells, driver_ridge_value)
+
+    # 詞頻統計
+    wordcloud_values = {'正面': 1.0, '中性': 0.0, '負面': -1.0}
+    if use_approx:
+        wordcloud_mask = sample_mask
+        if wordcloud_sentiment_value in wordcloud_values:
+            wordcloud_mask = sample_mask & (sample_df['sentiment'] == wordcloud_values[wordcloud_sentiment_value]).to_numpy()
+        sections.add('keywords', approx_word_freq, sample_df, wordcloud_mask)
+    else:
+        if wordcloud_sentiment_value in wordcloud_values:
+            wordcloud_texts = filtered_df.loc[filtered_df['sentiment'] == wordcloud_values[wordcloud_sentiment_value], 'text']
+        else:
+            wordcloud_texts = filtered_df['text']
+        sections.add('keywords', compute_word_freq, wordcloud_texts)
+
+    sections.add('star_dist', lambda d: d['star'].value_counts().sort_index(), filtered_df)
+    sections.add('sentiment_dist', lambda d: d['sentiment'].value_counts(), filtered_df)
+
+    phrase_counts = load_phrase_counts(data_version)
+    phrase_cells = cell_mask(
+        phrase_counts,
+        start_date.strftime('%Y-%m'),
+        end_date.strftime('%Y-%m'),
+        selected_stars,
+        selected_sentiment_values,
+        collapse_duplicates,
+        repeat_reviewers
+    )
+    phrase_sentiments = {'正面': 1.0, '中性': 0.0, '負面': -1.0}
+    drill_dimension_col = dict(zip(DIMENSION_NAMES, DIMENSIONS))[drill_dimension_value]
+    drill_phrase_labels = ['正面', '負面'] if drill_sentiment_value == '全部' else [drill_sentiment_value]
+    for phrase_label in drill_phrase_labels:
+        sections.add(
+            f'phrases_{phrase_label}', top_phrases,
+            phrase_counts, drill_dimension_col, phrase_cells, phrase_sentiments[phrase_label]
+        )
+
+    sections.add('repeat_reviewers', top_repeat_reviewers, filtered_df)
+    sections.add('csv', lambda d: d.to_csv(index=False).encode('utf-8-sig'), filtered_df)
 
     # KPI 指標區
     st.markdown('<a id="kpi"></a>', unsafe_allow_html=True)
     st.markdown("---")
     col1, col2, col3, col4, col5 = st.columns(5)
 
+    kpis = sections.result('kpis')
+    if use_approx:
+        total_text = f"≈{kpis['total'][0]:,.0f} ±{kpis['total'][1]:,.0f}"
+        avg_star_text = f"{kpis['avg_star'][0]:.2f} ±{kpis['avg_star'][1]:.2f}"
+        positive_text = f"{kpis['positive_pct'][0]:.1f}% ±{kpis['positive_pct'][1]:.1f}"
+        negative_text = f"{kpis['negative_pct'][0]:.1f}% ±{kpis['negative_pct'][1]:.1f}"
+    else:
+        total_text = f"{kpis['total']:,}"
+        avg_star_text = f"{kpis['avg_star']:.2f}"
+        positive_text = f"{kpis['positive_pct']:.1f}%"
+        negative_text = f"{kpis['negative_pct']:.1f}%"
+
     with col1:
         st.metric(
             label="📝 總評論數",
-            value=f"{len(filtered_df):,}"
+            value=total_text
         )
 
     with col2:
-        avg_star = filtered_df['star'].mean()
         st.metric(
             label="⭐ 平均星級",
-            value=f"{avg_star:.2f}"
+            value=avg_star_text
         )
 
     with col3:
-        positive_pct = (filtered_df['sentiment'] == 1.0).sum() / len(filtered_df) * 100 if len(filtered_df) > 0 else 0
         st.metric(
             label="😊 正面評價比例",
-            value=f"{positive_pct:.1f}%"
+            value=positive_text
         )
 
     with col4:
-        negative_pct = (filtered_df['sentiment'] == -1.0).sum() / len(filtered_df) * 100 if len(filtered_df) > 0 else 0
         st.metric(
             label="😞 負面評價比例",
-            value=f"{negative_pct:.1f}%"
+            value=negative_text
         )
 
     with col5:
-        date_span = (filtered_df['date'].max() - filtered_df['date'].min()).days
         st.metric(
             label="📅 時間跨度",
-            value=f"{date_span} 天"
+            value=f"{kpis['date_span']} 天"
         )
 
     st.markdown("---")
@@ -308,77 +650,17 @@ try:
 
     with tab1:
         # 月度趨勢
-        monthly_data = filtered_df.groupby('year_month').agg({
-            'star': 'mean',
-            'sentiment': 'mean',
-            'text': 'count'
-        }).reset_index()
-        monthly_data.columns = ['年月', '平均星級', '平均情感分數', '評論數']
-
-        fig1 = go.Figure()
-        fig1.add_trace(go.Scatter(
-            x=monthly_data['年月'],
-            y=monthly_data['平均星級'],
-            mode='lines+markers',
-            name='平均星級',
-            line=dict(color='#667eea', width=3),
-            marker=dict(size=8, color='#764ba2')
-        ))
-
-        fig1.add_trace(go.Bar(
-            x=monthly_data['年月'],
-            y=monthly_data['評論數'],
-            name='評論數',
-            yaxis='y2',
-            opacity=0.3,
-            marker_color='lightgray'
-        ))
-
-        fig1.update_layout(
-            title='月度平均星級趨勢',
-            xaxis_title='年月',
-            yaxis_title='平均星級',
-            yaxis2=dict(
-                title='評論數',
-                overlaying='y',
-                side='right'
-            ),
-            hovermode='x unified',
-            height=400,
-            showlegend=True
-        )
+        monthly_data = sections.result('monthly')
+
+        fig1 = monthly_trend_figure(monthly_data)
 
         st.plotly_chart(fig1, use_container_width=True)
 
     with tab2:
         # 年度趨勢
-        yearly_data = filtered_df.groupby('year').agg({
-            'star': 'mean',
-            'text': 'count',
-            'sentiment': 'mean'
-        }).reset_index()
-        yearly_data.columns = ['年份', '平均星級', '評論數', '平均情感分數']
-
-        fig2 = go.Figure()
-        fig2.add_trace(go.Bar(
-            x=yearly_data['年份'],
-            y=yearly_data['平均星級'],
-            name='平均星級',
-            text=yearly_data['平均星級'].round(2),
-            textposition='auto',
-            marker=dict(
-                color=yearly_data['平均星級'],
-                colorscale='Viridis',
-                showscale=False
-            )
-        ))
+        yearly_data = sections.result('yearly')
 
-        fig2.update_layout(
-            title='年度平均星級',
-            xaxis_title='年份',
-            yaxis_title='平均星級',
-            height=400
-        )
+        fig2 = yearly_trend_figure(yearly_data)
 
         st.plotly_chart(fig2, use_container_width=True)
 
@@ -387,31 +669,9 @@ try:
 
     with tab3:
         # 情感分布趨勢（改為百分比堆疊圖）
-        sentiment_time = filtered_df.groupby(['year_month', 'sentiment']).size().reset_index(name='count')
-
-        # 計算每個月的總數和百分比
-        total_by_month = sentiment_time.groupby('year_month')['count'].sum().reset_index()
-        total_by_month.columns = ['year_month', 'total']
-        sentiment_time = sentiment_time.merge(total_by_month, on='year_month')
-        sentiment_time['percentage'] = (sentiment_time['count'] / sentiment_time['total'] * 100).round(1)
-        sentiment_time['sentiment_label'] = sentiment_time['sentiment'].map(sentiment_map)
-
-        fig3 = px.area(
-            sentiment_time,
-            x='year_month',
-            y='percentage',
-            color='sentiment_label',
-            title='情感分布時間趨勢（百分比）',
-            labels={'year_month': '年月', 'percentage': '百分比 (%)', 'sentiment_label': '情感'},
-            color_discrete_map={'正面': '#48bb78', '中性': '#ed8936', '負面': '#f56565'},
-            groupnorm='percent'  # 堆疊百分比模式
-        )
+        sentiment_time = sections.result('sentiment_trend')
 
-        fig3.update_layout(
-            height=400,
-            yaxis=dict(range=[0, 100], ticksuffix='%'),
-            hovermode='x unified'
-        )
+        fig3 = sentiment_trend_figure(sentiment_time)
 
         st.plotly_chart(fig3, use_container_width=True)
 
@@ -437,48 +697,10 @@ try:
 
     with col1:
         # 各維度平均分數
-        dimensions = [
-            'r_sentiment.Staff Service',
-            'r_sentiment.Location',
-            'r_sentiment.Room & Bathroom Quality',
-            'r_sentiment.Environment',
-            'r_sentiment.Facilities',
-            'r_sentiment.Food & Beverage',
-            'r_sentiment.Value'
-        ]
-
-        dimension_names = [
-            '員工服務',
-            '地點位置',
-            '房間浴室品質',
-            '環境',
-            '設施',
-            '餐飲',
-            '性價比'
-        ]
-
-        avg_scores = []
-        for dim in dimensions:
-            avg_scores.append(filtered_df[dim].mean())
-
-        dimension_df = pd.DataFrame({
-            '維度': dimension_names,
-            '平均分數': avg_scores
-        }).sort_values('平均分數', ascending=True)
-
-        fig4 = px.bar(
-            dimension_df,
-            x='平均分數',
-            y='維度',
-            orientation='h',
-            title='各維度平均情感分數',
-            color='平均分數',
-            color_continuous_scale='RdYlGn',
-            text='平均分數'
-        )
+        dimension_df = sections.result('dimensions')
+
+        fig4 = dimension_figure(dimension_df, approx=use_approx)
 
-        fig4.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-        fig4.update_layout(height=400, showlegend=False)
         st.plotly_chart(fig4, use_container_width=True)
 
     with col2:
@@ -487,28 +709,7 @@ try:
 
         # 檢查是否有數據
         if len(radar_df) > 0:
-            fig5 = go.Figure()
-
-            fig5.add_trace(go.Scatterpolar(
-                r=radar_df['平均分數'].tolist() + [radar_df['平均分數'].tolist()[0]],
-                theta=radar_df['維度'].tolist() + [radar_df['維度'].tolist()[0]],
-                fill='toself',
-                name='平均分數',
-                line=dict(color='#667eea', width=2),
-                fillcolor='rgba(102, 126, 234, 0.4)'
-            ))
-
-            fig5.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[-1, 1]
-                    )
-                ),
-                showlegend=False,
-                title='各維度評分雷達圖',
-                height=400
-            )
+            fig5 = radar_figure(radar_df)
 
             st.plotly_chart(fig5, use_container_width=True)
         else:
@@ -623,6 +824,68 @@ try:
 
     st.markdown("---")
 
+    # 驅動因素分析
+    st.markdown('<a id="drivers"></a>', unsafe_allow_html=True)
+    st.subheader("🧭 維度驅動因素分析")
+    st.markdown("*哪些服務面向最能解釋星級評分（以月份為單位套用日期範圍；合併重複評論時以整份資料中最早的一則為準）*")
+
+    st.slider(
+        "正則化強度 (ridge λ)",
+        min_value=0.0,
+        max_value=1.0,
+        value=0.1,
+        step=0.05,
+        key='driver_ridge',
+        help="維度分數多為缺值，成對相關矩陣可能不穩定，加入正則化可讓係數較穩定"
+    )
+
+    driver_df, driver_r2, driver_n = sections.result('drivers')
+
+    if driver_n >= 30:
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            driver_plot_df = driver_df.sort_values('標準化迴歸係數', ascending=True)
+            fig_driver = go.Figure(data=[
+                go.Bar(
+                    x=driver_plot_df['標準化迴歸係數'],
+                    y=driver_plot_df['維度'],
+                    orientation='h',
+                    text=driver_plot_df['標準化迴歸係數'].round(2),
+                    textposition='auto',
+                    marker=dict(
+                        color=driver_plot_df['標準化迴歸係數'],
+                        colorscale='RdYlGn',
+                        cmid=0,
+                        showscale=False
+                    )
+                )
+            ])
+            fig_driver.update_layout(
+                title='各維度對星級的標準化迴歸係數',
+                xaxis_title='標準化迴歸係數',
+                yaxis_title='維度',
+                height=400
+            )
+            st.plotly_chart(fig_driver, use_container_width=True)
+
+        with col2:
+            st.metric(label="📐 解釋力 (R²)", value=f"{driver_r2:.2f}")
+            st.metric(label="📝 評論數", value=f"{driver_n:,}")
+            top_driver = driver_df.loc[driver_df['標準化迴歸係數'].idxmax(), '維度']
+            st.info(f"💡 在目前篩選下，**{top_driver}** 對星級的影響最大")
+
+        st.markdown("**詳細係數**")
+        st.dataframe(
+            driver_df.sort_values('標準化迴歸係數', ascending=False).round(3),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("💡 篩選後的評論數不足（至少 30 筆）進行驅動因素分析")
+
+    st.markdown("---")
+
     # 詞雲圖區域
     st.markdown('<a id="wordcloud"></a>', unsafe_allow_html=True)
     st.subheader("☁️ 評論關鍵詞雲")
@@ -631,82 +894,36 @@ try:
     wordcloud_sentiment = st.radio(
         "選擇要分析的情感類型",
         options=['全部', '正面', '中性', '負面'],
-        horizontal=True
+        horizontal=True,
+        key='wordcloud_sentiment'
     )
 
-    # 根據選擇篩選文字
-    if wordcloud_sentiment == '正面':
-        wordcloud_df = filtered_df[filtered_df['sentiment'] == 1.0]
-    elif wordcloud_sentiment == '中性':
-        wordcloud_df = filtered_df[filtered_df['sentiment'] == 0.0]
-    elif wordcloud_sentiment == '負面':
-        wordcloud_df = filtered_df[filtered_df['sentiment'] == -1.0]
+    if use_approx:
+        has_text = sample_df['text'][wordcloud_mask].notna().any()
     else:
-        wordcloud_df = filtered_df
-
-    # 合併所有評論文字
-    all_text = ' '.join(wordcloud_df['text'].dropna().astype(str))
-
-    if len(all_text) > 0:
-        # 簡易詞頻統計（中文分詞需要 jieba，這裡先用簡單的字詞統計）
-        import re
-        from collections import Counter
-
-        # 移除標點符號和數字
-        text_cleaned = re.sub(r'[^\w\s]', ' ', all_text)
-        text_cleaned = re.sub(r'\d+', '', text_cleaned)
-
-        # 簡單的詞頻統計（這裡統計 2-4 個字的詞）
-        words = []
-        for length in [2, 3, 4]:
-            for i in range(len(text_cleaned) - length + 1):
-                word = text_cleaned[i:i+length]
-                if word.strip() and not word.isspace():
-                    words.append(word.strip())
-
-        # 統計詞頻
-        word_freq = Counter(words)
-        # 過濾停用詞（常見但無意義的詞）
-        stop_words = {'的', '了', '和', '是', '在', '有', '我', '就', '不', '也', '都', '這', '那', '要', '會', '可', '能', '但', '很', '還', '沒', '說', '而', '到', '去', '對', '與', '及', '以', '被', '給', '把', '讓', '為', '從', '向', '於', '比', '讓我', '我們', '你們', '他們', '這個', '那個', '什麼', '如果', '因為', '所以', '雖然', '然而', '當然', '可以', '應該', '可能', '一定'}
-        word_freq = {k: v for k, v in word_freq.items() if k not in stop_words and v >= 3}
-
-        # 取前 30 個高頻詞
-        top_words = dict(sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:30])
-
-        if top_words:
-            # 使用柱狀圖顯示詞頻（替代詞雲）
-            words_df = pd.DataFrame(list(top_words.items()), columns=['詞彙', '出現次數'])
-            words_df = words_df.sort_values('出現次數', ascending=True).tail(20)
+        has_text = wordcloud_texts.notna().any()
 
-            fig_words = go.Figure(data=[
-                go.Bar(
-                    y=words_df['詞彙'],
-                    x=words_df['出現次數'],
-                    orientation='h',
-                    text=words_df['出現次數'],
-                    textposition='auto',
-                    marker=dict(
-                        color=words_df['出現次數'],
-                        colorscale='Viridis',
-                        showscale=False
-                    )
-                )
-            ])
+    if has_text:
+        # 統計詞頻並取前 30 個高頻詞（已在區塊排程中計算）
+        if use_approx:
+            freq_df = sections.result('keywords')
+        else:
+            top_words = sections.result('keywords')
+            freq_df = pd.DataFrame(list(top_words.items()), columns=['詞彙', '出現次數'])
 
-            fig_words.update_layout(
-                title=f'前 20 名高頻詞彙 - {wordcloud_sentiment}評論',
-                xaxis_title='出現次數',
-                yaxis_title='詞彙',
-                height=600,
-                showlegend=False
-            )
+        if len(freq_df) > 0:
+            # 使用柱狀圖顯示詞頻（替代詞雲）
+            words_df = freq_df.sort_values('出現次數', ascending=True).tail(20)
+
+            fig_words = word_freq_figure(words_df, wordcloud_sentiment, approx=use_approx)
 
             st.plotly_chart(fig_words, use_container_width=True)
 
             # 顯示完整詞頻表
             with st.expander("📋 查看完整詞頻列表"):
-                full_words_df = pd.DataFrame(list(top_words.items()), columns=['詞彙', '出現次數'])
-                full_words_df = full_words_df.sort_values('出現次數', ascending=False)
+                full_words_df = freq_df.sort_values('出現次數', ascending=False)
+                if use_approx:
+                    full_words_df = full_words_df.rename(columns={'信賴區間': '95% 信賴區間 (±)'}).round(0)
                 st.dataframe(full_words_df, use_container_width=True, hide_index=True)
 
         else:
@@ -724,49 +941,16 @@ try:
 
     with col1:
         # 星級分布
-        star_dist = filtered_df['star'].value_counts().sort_index()
-
-        fig6 = go.Figure()
-        fig6.add_trace(go.Bar(
-            x=star_dist.index,
-            y=star_dist.values,
-            text=star_dist.values,
-            textposition='auto',
-            marker=dict(
-                color=['#f56565', '#fc8181', '#fbd38d', '#4299e1', '#48bb78'],
-                line=dict(color='white', width=2)
-            )
-        ))
+        star_dist = sections.result('star_dist')
 
-        fig6.update_layout(
-            title='星級分布',
-            xaxis_title='星級',
-            yaxis_title='評論數',
-            height=400
-        )
+        fig6 = star_distribution_figure(star_dist)
 
         st.plotly_chart(fig6, use_container_width=True)
 
     with col2:
         # 情感分布圓餅圖
-        sentiment_dist = filtered_df['sentiment'].value_counts()
-        sentiment_labels = [sentiment_map.get(k, '未知') for k in sentiment_dist.index]
-
-        fig7 = go.Figure(data=[go.Pie(
-            labels=sentiment_labels,
-            values=sentiment_dist.values,
-            hole=0.4,
-            marker=dict(
-                colors=['#f56565', '#ed8936', '#48bb78'],
-                line=dict(color='white', width=2)
-            ),
-            textfont=dict(size=14, color='white', family='Arial')
-        )])
-
-        fig7.update_layout(
-            title='情感分布',
-            height=400
-        )
+        sentiment_dist = sections.result('sentiment_dist')
+        fig7 = sentiment_distribution_figure(sentiment_dist, sentiment_map)
 
         st.plotly_chart(fig7, use_container_width=True)
 
@@ -813,7 +997,8 @@ try:
     selected_dimension = st.selectbox(
         "🎯 選擇要深入分析的維度",
         options=list(dimension_mapping.keys()),
-        index=0
+        index=0,
+        key='drill_dimension'
     )
 
     # 獲取選定維度的欄位
@@ -881,7 +1066,8 @@ try:
             dim_sentiment_filter = st.radio(
                 "篩選情感",
                 options=['全部', '正面', '中性', '負面'],
-                horizontal=True
+                horizontal=True,
+                key='dim_sentiment_filter'
             )
 
         with col2:
@@ -920,6 +1106,94 @@ try:
                 }
             )
 
+        # 該維度的高頻片語（預先計算的分格計數，切換維度或情感只需查表加總）
+        st.markdown(f"**🏷️ {selected_dimension} 高頻片語**")
+        if dim_sentiment_filter == '全部':
+            phrase_panels = [('正面', '#48bb78'), ('負面', '#f56565')]
+        else:
+            phrase_panels = [(dim_sentiment_filter, {'正面': '#48bb78', '中性': '#ed8936', '負面': '#f56565'}[dim_sentiment_filter])]
+
+        for phrase_col, (phrase_label, phrase_color) in zip(st.columns(len(phrase_panels)), phrase_panels):
+            with phrase_col:
+                phrase_df = sections.result(f'phrases_{phrase_label}')
+                if len(phrase_df) > 0:
+                    phrase_plot_df = phrase_df.sort_values('評論數', ascending=True)
+                    fig_phrase = go.Figure(data=[
+                        go.Bar(
+                            x=phrase_plot_df['評論數'],
+                            y=phrase_plot_df['片語'],
+                            orientation='h',
+                            text=phrase_plot_df['評論數'],
+                            textposition='auto',
+                            marker=dict(color=phrase_color)
+                        )
+                    ])
+                    fig_phrase.update_layout(
+                        title=f'{phrase_label}評論常見片語',
+                        xaxis_title='評論數',
+                        yaxis_title='片語',
+                        height=450
+                    )
+                    st.plotly_chart(fig_phrase, use_container_width=True)
+                else:
+                    st.info(f"📝 {phrase_label}評論中沒有出現 2 次以上的片語")
+        st.caption("片語取自各維度的相關評論（reasons），日期範圍以月份為單位套用；合併重複評論時以整份資料中最早的一則為準")
+
+        # 相似評論檢索
+        with st.expander("🔎 找出相似評論（More like this）"):
+            # 可搜尋此維度篩選後的所有評論，選單只列出符合的最新幾則（展開區收合時也會執行，需保持輕量）
+            similar_query = st.text_input("搜尋評論（姓名或內容關鍵字）", key='similar_query').strip()
+            similar_pool = filtered_dim_df
+            if similar_query:
+                similar_pool = similar_pool[
+                    similar_pool['text'].str.contains(similar_query, regex=False, na=False) |
+                    similar_pool['name'].str.contains(similar_query, regex=False, na=False)
+                ]
+            similar_source = similar_pool['date'].nlargest(SIMILAR_PICKER_ROWS).index.tolist()
+            if similar_source:
+                similar_target = st.selectbox(
+                    f"選擇一則評論（符合 {len(similar_pool):,} 則，列出最新 {len(similar_source)} 則）",
+                    options=similar_source,
+                    format_func=lambda i: f"{df.at[i, 'date']:%Y-%m-%d} {df.at[i, 'name']}：{str(df.at[i, 'text'])[:40]}…"
+                )
+                col_field, col_k = st.columns([2, 1])
+                with col_field:
+                    similar_by = st.radio(
+                        "比對內容",
+                        options=['完整評論', f'{selected_dimension}相關評論'],
+                        horizontal=True
+                    )
+                with col_k:
+                    similar_k = st.slider("顯示筆數", min_value=5, max_value=30, value=10)
+
+                similar_field = 'text' if similar_by == '完整評論' else reasons_col
+                candidate_mask = np.zeros(len(df), dtype=bool)
+                candidate_mask[df.index.get_indexer(filtered_df.index)] = True
+                positions, scores = find_similar(
+                    load_similarity_index(data_version),
+                    similar_field,
+                    df.index.get_loc(similar_target),
+                    candidate_mask,
+                    k=similar_k
+                )
+
+                if len(positions) > 0:
+                    similar_df = df.iloc[positions][['date', 'name', 'star', similar_field]].copy()
+                    similar_df.insert(0, '相似度', scores.round(3))
+                    similar_df.columns = ['相似度', '日期', '姓名', '星級', similar_by]
+                    st.dataframe(
+                        similar_df,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            '日期': st.column_config.DateColumn('日期', format='YYYY-MM-DD')
+                        }
+                    )
+                else:
+                    st.info("目前篩選條件下沒有相似的評論")
+            else:
+                st.info("沒有符合搜尋的評論")
+
         # 詳細評論展開區
         with st.expander(f"💬 查看 {selected_dimension} 的詳細評論內容"):
             for idx, row in filtered_dim_df.head(5).iterrows():
@@ -942,6 +1216,81 @@ try:
 
     st.markdown("---")
 
+    # 評論者分析區
+    st.markdown('<a id="reviewers"></a>', unsafe_allow_html=True)
+    st.subheader("👥 重複評論者分析")
+    st.markdown("*查看同一位評論者多次評論的星級與各維度變化*")
+
+    repeat_summary = sections.result('repeat_reviewers')
+
+    if len(repeat_summary) > 0:
+        col1, col2 = st.columns([1, 2])
+
+        with col1:
+            st.markdown("**篩選範圍內評論最多的重複評論者**")
+            st.dataframe(
+                repeat_summary.drop(columns='reviewer_id'),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    '平均星級': st.column_config.NumberColumn('平均星級', format='%.2f'),
+                    '最近評論': st.column_config.DateColumn('最近評論', format='YYYY-MM-DD')
+                }
+            )
+
+        with col2:
+            reviewer_name = st.selectbox(
+                "選擇評論者",
+                options=repeat_summary['姓名'].tolist()
+            )
+            search_name = st.text_input("或輸入姓名查詢", value="")
+            target_name = search_name.strip() or reviewer_name
+
+            reviewer_reviews = df.iloc[reviewer_positions(load_reviewer_index(data_version), target_name)]
+
+            if len(reviewer_reviews) > 0:
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.metric(label="📝 評論數", value=f"{len(reviewer_reviews):,}")
+                with col_b:
+                    st.metric(label="⭐ 平均星級", value=f"{reviewer_reviews['star'].mean():.2f}")
+
+                trend = reviewer_dimension_trend(reviewer_reviews)
+
+                fig_reviewer = go.Figure()
+                fig_reviewer.add_trace(go.Scatter(
+                    x=trend['日期'],
+                    y=trend['星級'],
+                    mode='lines+markers',
+                    name='星級',
+                    line=dict(color='#667eea', width=3),
+                    marker=dict(size=10, color='#764ba2')
+                ))
+                fig_reviewer.update_layout(
+                    title=f'{target_name} 的星級變化',
+                    xaxis_title='日期',
+                    yaxis_title='星級',
+                    yaxis=dict(range=[0.5, 5.5]),
+                    height=300
+                )
+                st.plotly_chart(fig_reviewer, use_container_width=True)
+
+                st.markdown("**各維度情感分數**")
+                st.dataframe(
+                    trend,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        '日期': st.column_config.DateColumn('日期', format='YYYY-MM-DD')
+                    }
+                )
+            else:
+                st.info(f"找不到評論者「{target_name}」")
+    else:
+        st.info("💡 篩選範圍內沒有重複評論者")
+
+    st.markdown("---")
+
     # 評論瀏覽區
     st.markdown('<a id="reviews"></a>', unsafe_allow_html=True)
     st.subheader("💬 評論內容瀏覽")
@@ -969,12 +1318,92 @@ try:
 
     st.dataframe(display_data, use_container_width=True, height=400)
 
+    # 版本比較區
+    st.markdown("---")
+    st.markdown('<a id="versions"></a>', unsafe_allow_html=True)
+    st.subheader("🕓 資料版本比較")
+    st.markdown("*比較兩個資料版本之間新增、移除與修改的評論，以及在目前篩選下的指標差異*")
+
+    if len(version_options) >= 2:
+        col1, col2 = st.columns(2)
+        with col1:
+            base_version = st.selectbox(
+                "基準版本",
+                options=version_options,
+                index=1,
+                format_func=version_label
+            )
+        with col2:
+            target_version = st.selectbox(
+                "比較版本",
+                options=version_options,
+                index=0,
+                format_func=version_label
+            )
+
+        # 比較需讀取兩個版本，開啟後才計算，避免每次調整篩選都重新比較
+        compare_enabled = st.toggle("顯示版本比較結果", value=False, key='compare_versions')
+        if base_version == target_version:
+            st.info("💡 請選擇兩個不同的版本")
+        elif compare_enabled:
+            version_diff, base_kpis, target_kpis = load_version_comparison(
+                base_version, target_version,
+                (start_date, end_date, selected_stars, selected_sentiment_values,
+                 collapse_duplicates, repeat_reviewers)
+            )
+
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                st.metric(label="➕ 新增", value=f"{len(version_diff['added']):,}")
+            with col2:
+                st.metric(label="➖ 移除", value=f"{len(version_diff['removed']):,}")
+            with col3:
+                st.metric(label="✏️ 修改", value=f"{len(version_diff['changed']):,}")
+            with col4:
+                st.metric(
+                    label="📝 篩選後評論數",
+                    value=f"{target_kpis['total']:,}",
+                    delta=f"{target_kpis['total'] - base_kpis['total']:+,}"
+                )
+            with col5:
+                st.metric(
+                    label="⭐ 篩選後平均星級",
+                    value=f"{target_kpis['avg_star']:.2f}",
+                    delta=f"{target_kpis['avg_star'] - base_kpis['avg_star']:+.3f}"
+                )
+
+            diff_tabs = st.tabs(["新增的評論", "移除的評論", "修改的評論"])
+            for diff_tab, diff_key in zip(diff_tabs, ['added', 'removed', 'changed']):
+                with diff_tab:
+                    diff_df = version_diff[diff_key]
+                    if len(diff_df) == 0:
+                        st.info("沒有符合的評論")
+                        continue
+                    diff_columns = ['date', 'name', 'star', 'sentiment', 'text']
+                    if diff_key == 'changed':
+                        diff_columns = ['_changed_columns'] + diff_columns
+                    diff_show = diff_df[diff_columns].head(100).copy()
+                    diff_show.columns = (['修改的欄位'] if diff_key == 'changed' else []) + ['日期', '姓名', '星級', '情感', '評論內容']
+                    diff_show['情感'] = diff_show['情感'].map(sentiment_map)
+                    st.dataframe(
+                        diff_show,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            '日期': st.column_config.DateColumn('日期', format='YYYY-MM-DD')
+                        }
+                    )
+                    if len(diff_df) > 100:
+                        st.caption(f"僅顯示前 100 筆（共 {len(diff_df):,} 筆）")
+    else:
+        st.info("💡 目前只有一個資料版本，來源檔更新後即可比較")
+
     # 下載功能
     st.markdown("---")
     st.markdown('<a id="download"></a>', unsafe_allow_html=True)
     st.subheader("📥 資料下載")
 
-    csv = filtered_df.to_csv(index=False).encode('utf-8-sig')
+    csv = sections.result('csv')
     st.download_button(
         label="下載篩選後的資料 (CSV)",
         data=csv,
@@ -0,0 +1,226 @@
+"""本機離線的面向情感評分：以詞典與規則為缺少 sentiment / r_sentiment.* / reasons.* 的評論補上分數
+
+規則：
+    1. 以標點將評論切成子句
+    2. 子句中出現某維度的面向詞，即視為提到該維度
+    3. 子句情感 = 正面詞數 - 負面詞數（前方 3 字內有否定詞則反轉，不跨過前一個情感詞）
+    4. 維度分數 = 提到該維度的子句情感總和的正負號（-1 / 0 / 1），相關子句作為 reasons 摘要
+
+批次補分（大量資料以多個程序平行處理）：
+    python aspect_scorer.py new_reviews.xlsx -o scored.xlsx --workers 8
+
+修改詞典後檢查常見句型的評分是否仍正確：
+    python aspect_scorer.py --check
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# 各維度的面向詞（鍵為 r_sentiment.* / reasons.* 的欄位後綴）
+ASPECT_LEXICON = {
+    'Staff Service': ['服務', '人員', '員工', '櫃檯', '櫃台', '接待', '管家', '態度', '服務生', '門房', '禮賓', '入住', '退房', 'check in', 'check out', 'staff'],
+    'Location': ['地點', '位置', '交通', '捷運', '附近', '周邊', '週邊', '101', '信義', '商圈', '逛街', '步行', 'location'],
+    'Room & Bathroom Quality': ['房間', '客房', '浴室', '浴缸', '床', '枕頭', '衛浴', '淋浴', '廁所', '馬桶', '隔音', '備品', '毛巾', '冷氣', 'room'],
+    'Environment': ['環境', '氣氛', '氛圍', '裝潢', '景觀', '夜景', '視野', '音樂', '風格', '大廳'],
+    'Facilities': ['設施', '設備', '泳池', '游泳池', '健身房', '停車', '電梯', 'wifi', '網路', 'spa', '三溫暖'],
+    'Food & Beverage': ['早餐', '餐廳', '餐點', '酒吧', '調酒', '飲料', '食物', '料理', '自助餐', 'buffet', '下午茶', '咖啡', '甜點', '晚餐'],
+    'Value': ['價格', '價錢', '價位', 'cp值', '性價比', '房價', '費用', '收費', '划算', '物超所值', '不值']
+}
+
+POSITIVE_WORDS = [
+    '好', '棒', '讚', '優', '佳', '舒適', '舒服', '乾淨', '整潔', '親切', '熱情', '貼心', '專業', '方便', '便利',
+    '推薦', '喜歡', '滿意', '漂亮', '美', '快速', '安靜', '划算', '值得', '豐富', '好吃', '美味', '寬敞', '驚喜',
+    '周到', '用心', '友善', '完美', '開心', '愉快', '細心', '有禮', '物超所值', '感謝', '不錯', '無敵', '無可挑剔'
+]
+NEGATIVE_WORDS = [
+    '差', '爛', '糟', '髒', '臭', '吵', '貴', '慢', '舊', '冷漠', '失望', '不滿', '抱怨', '難吃', '擁擠', '壞',
+    '刁難', '等很久', '發霉', '噁心', '無禮', '敷衍', '可惜', '不值', '不好', '不佳', '不推薦', '不舒服', '不專業',
+    '不耐煩', '不乾淨', '傲慢', '態度差', '雷', '誇張', '扣分', '退步'
+]
+# 單獨的「無」常見於正面複合詞（無敵、無可挑剔），只以「無法」視為否定
+NEGATIONS = ('不', '沒', '未', '無法', '別', '並非')
+NEGATION_WINDOW = 3
+
+CLAUSE_SPLIT = re.compile(r'[，,。.!！?？;；\n~～]+')
+REASON_MAX_LENGTH = 100
+# 少於此筆數時直接在目前程序計算，避免啟動程序池的成本
+PARALLEL_MIN_ROWS = 20000
+CHUNK_SIZE = 5000
+
+
+def _alternation(words):
+    # 長詞優先，避免「不好」被拆成「好」
+    return re.compile('|'.join(re.escape(w) for w in sorted(set(words), key=len, reverse=True)))
+
+
+_ASPECT_DIMENSIONS = {}
+for _dim, _words in ASPECT_LEXICON.items():
+    for _word in _words:
+        _ASPECT_DIMENSIONS.setdefault(_word, []).append(_dim)
+_ASPECT_PATTERN = _alternation(_ASPECT_DIMENSIONS)
+
+_POLARITY = {w: 1 for w in POSITIVE_WORDS}
+_POLARITY.update({w: -1 for w in NEGATIVE_WORDS})
+_SENTIMENT_PATTERN = _alternation(_POLARITY)
+
+
+def _clause_polarity(clause):
+    score = 0
+    previous_end = 0
+    for match in _SENTIMENT_PATTERN.finditer(clause):
+        polarity = _POLARITY[match.group()]
+        # 否定詞範圍不跨過前一個情感詞，避免「不錯很好」的「不」反轉「好」
+        window = clause[max(previous_end, match.start() - NEGATION_WINDOW):match.start()]
+        if any(neg in window for neg in NEGATIONS):
+            polarity = -polarity
+        score += polarity
+        previous_end = match.end()
+    return score
+
+
+def score_text(text):
+    """評分單則評論，回傳 (整體情感, {維度: 分數}, {維度: 相關子句})"""
+    scores = {}
+    reasons = {}
+    total = 0
+    for clause in CLAUSE_SPLIT.split(text):
+        clause = clause.strip()
+        if not clause:
+            continue
+        lowered = clause.lower()
+        polarity = _clause_polarity(lowered)
+        total += polarity
+
+        dims = {d for m in _ASPECT_PATTERN.finditer(lowered) for d in _ASPECT_DIMENSIONS[m.group()]}
+        for dim in dims:
+            scores[dim] = scores.get(dim, 0) + polarity
+            reasons.setdefault(dim, []).append(clause)
+
+    return (
+        float(np.sign(total)),
+        {dim: float(np.sign(s)) for dim, s in scores.items()},
+        {dim: '，'.join(r)[:REASON_MAX_LENGTH] for dim, r in reasons.items()}
+    )
+
+
+# 常見句型的預期評分（python aspect_scorer.py --check），修改詞典或規則後應全部通過
+LEXICON_CHECKS = [
+    ('地點無敵方便', 'Location', 1.0),
+    ('房間不錯', 'Room & Bathroom Quality', 1.0),
+    ('早餐不錯很好吃', 'Food & Beverage', 1.0),
+    ('服務無可挑剔', 'Staff Service', 1.0),
+    ('服務人員很親切', 'Staff Service', 1.0),
+    ('房間不乾淨', 'Room & Bathroom Quality', -1.0),
+    ('早餐不好吃', 'Food & Beverage', -1.0),
+    ('櫃檯態度不專業', 'Staff Service', -1.0),
+    ('房價不便宜也不值得', 'Value', -1.0),
+    ('枕頭睡起來無法舒服', 'Room & Bathroom Quality', -1.0),
+]
+
+
+def check_lexicon():
+    """逐一檢查 LEXICON_CHECKS，回傳不符合預期的 [(句子, 維度, 預期, 實際)]"""
+    failures = []
+    for text, dimension, expected in LEXICON_CHECKS:
+        actual = score_text(text)[1].get(dimension, np.nan)
+        if actual != expected:
+            failures.append((text, dimension, expected, actual))
+    return failures
+
+
+def score_chunk(texts):
+    """評分一批評論，回傳欄位名稱 -> 值列表（可跨程序傳遞）"""
+    columns = {'sentiment': []}
+    for dim in ASPECT_LEXICON:
+        columns[f'r_sentiment.{dim}'] = []
+        columns[f'reasons.{dim}'] = []
+
+    for text in texts:
+        sentiment, scores, reasons = score_text(text)
+        columns['sentiment'].append(sentiment)
+        for dim in ASPECT_LEXICON:
+            columns[f'r_sentiment.{dim}'].append(scores.get(dim, np.nan))
+            columns[f'reasons.{dim}'].append(reasons.get(dim))
+    return columns
+
+
+def score_reviews(texts, workers=None, chunk_size=CHUNK_SIZE):
+    """評分多則評論；筆數夠多時切塊交給程序池平行處理，回傳 DataFrame
+
+    workers=1 一律在目前程序計算；伺服器內（多執行緒）呼叫時必須如此，程序池只供命令列使用。
+    """
+    texts = list(texts)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if len(texts) < PARALLEL_MIN_ROWS or workers == 1:
+        results = [score_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = list(pool.map(score_chunk, chunks))
+
+    if not results:
+        return pd.DataFrame(columns=list(score_chunk([]).keys()))
+    return pd.concat([pd.DataFrame(r) for r in results], ignore_index=True)
+
+
+def needs_scoring(df):
+    """有評論文字但沒有任何情感分數的列"""
+    score_columns = ['sentiment'] + [f'r_sentiment.{dim}' for dim in ASPECT_LEXICON]
+    present = [c for c in score_columns if c in df.columns]
+    missing = df[present].isna().all(axis=1) if present else pd.Series(True, index=df.index)
+    return missing & df['text'].notna()
+
+
+def fill_missing_scores(df, workers=None):
+    """為缺少分數的評論補上本機評分，並以 scored_locally 欄位標記"""
+    mask = needs_scoring(df)
+    df['scored_locally'] = mask.to_numpy()
+    if not mask.any():
+        return df
+
+    scored = score_reviews(df.loc[mask, 'text'].astype(str), workers=workers)
+    scored.index = df.index[mask]
+    for col in scored.columns:
+        if col not in df.columns:
+            df[col] = scored[col].reindex(df.index)
+            continue
+        # 整欄空白的 reasons.* 會被讀成 float，先轉成文字型別再寫入
+        if not pd.api.types.is_numeric_dtype(scored[col]) and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(scored[col].dtype)
+        df.loc[mask, col] = scored[col]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='為缺少情感分數的評論補上本機規則評分')
+    parser.add_argument('input', nargs='?', help='輸入的 xlsx 檔（需有 text 欄位）')
+    parser.add_argument('-o', '--output', help='輸出的 xlsx 檔')
+    parser.add_argument('--workers', type=int, default=None, help='程序數（預設為 CPU 數）')
+    parser.add_argument('--check', action='store_true', help='檢查常見句型的評分是否符合預期')
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check_lexicon()
+        for text, dimension, expected, actual in failures:
+            print(f"✗ {text}（{dimension}）：預期 {expected:+.0f}，實際 {actual}")
+        print(f"{len(LEXICON_CHECKS) - len(failures)} / {len(LEXICON_CHECKS)} 項通過")
+        raise SystemExit(1 if failures else 0)
+    if not args.input or not args.output:
+        parser.error('需要輸入檔與 -o 輸出檔（或使用 --check）')
+
+    df = pd.read_excel(args.input)
+    start = time.perf_counter()
+    df = fill_missing_scores(df, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    count = int(df['scored_locally'].sum())
+    print(f"本機評分 {count:,} 筆，耗時 {elapsed:.1f} 秒（{count / max(elapsed, 1e-9):,.0f} 筆/秒）")
+    df.to_excel(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
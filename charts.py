@@ -0,0 +1,205 @@
+"""儀表板圖表（Streamlit 頁面與靜態快照共用，確保兩者外觀一致）"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def monthly_trend_figure(monthly_data):
+    """月度平均星級與評論數"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=monthly_data['年月'],
+        y=monthly_data['平均星級'],
+        mode='lines+markers',
+        name='平均星級',
+        line=dict(color='#667eea', width=3),
+        marker=dict(size=8, color='#764ba2')
+    ))
+
+    fig.add_trace(go.Bar(
+        x=monthly_data['年月'],
+        y=monthly_data['評論數'],
+        name='評論數',
+        yaxis='y2',
+        opacity=0.3,
+        marker_color='lightgray'
+    ))
+
+    fig.update_layout(
+        title='月度平均星級趨勢',
+        xaxis_title='年月',
+        yaxis_title='平均星級',
+        yaxis2=dict(
+            title='評論數',
+            overlaying='y',
+            side='right'
+        ),
+        hovermode='x unified',
+        height=400,
+        showlegend=True
+    )
+    return fig
+
+
+def yearly_trend_figure(yearly_data):
+    """年度平均星級"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=yearly_data['年份'],
+        y=yearly_data['平均星級'],
+        name='平均星級',
+        text=yearly_data['平均星級'].round(2),
+        textposition='auto',
+        marker=dict(
+            color=yearly_data['平均星級'],
+            colorscale='Viridis',
+            showscale=False
+        )
+    ))
+
+    fig.update_layout(
+        title='年度平均星級',
+        xaxis_title='年份',
+        yaxis_title='平均星級',
+        height=400
+    )
+    return fig
+
+
+def sentiment_trend_figure(sentiment_time):
+    """每月情感分布百分比堆疊圖"""
+    fig = px.area(
+        sentiment_time,
+        x='year_month',
+        y='percentage',
+        color='sentiment_label',
+        title='情感分布時間趨勢（百分比）',
+        labels={'year_month': '年月', 'percentage': '百分比 (%)', 'sentiment_label': '情感'},
+        color_discrete_map={'正面': '#48bb78', '中性': '#ed8936', '負面': '#f56565'},
+        groupnorm='percent'  # 堆疊百分比模式
+    )
+
+    fig.update_layout(
+        height=400,
+        yaxis=dict(range=[0, 100], ticksuffix='%'),
+        hovermode='x unified'
+    )
+    return fig
+
+
+def dimension_figure(dimension_df, approx=False):
+    """各維度平均情感分數；approx 時加上 95% 信賴區間誤差線"""
+    fig = px.bar(
+        dimension_df,
+        x='平均分數',
+        y='維度',
+        orientation='h',
+        title='各維度平均情感分數' + ('（近似，誤差線為 95% 信賴區間）' if approx else ''),
+        color='平均分數',
+        color_continuous_scale='RdYlGn',
+        text='平均分數',
+        error_x='信賴區間' if approx else None
+    )
+
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    fig.update_layout(height=400, showlegend=False)
+    return fig
+
+
+def radar_figure(radar_df):
+    """各維度評分雷達圖（radar_df 不可含缺值）"""
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatterpolar(
+        r=radar_df['平均分數'].tolist() + [radar_df['平均分數'].tolist()[0]],
+        theta=radar_df['維度'].tolist() + [radar_df['維度'].tolist()[0]],
+        fill='toself',
+        name='平均分數',
+        line=dict(color='#667eea', width=2),
+        fillcolor='rgba(102, 126, 234, 0.4)'
+    ))
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[-1, 1]
+            )
+        ),
+        showlegend=False,
+        title='各維度評分雷達圖',
+        height=400
+    )
+    return fig
+
+
+def word_freq_figure(words_df, sentiment_label, approx=False):
+    """高頻詞彙橫條圖；approx 時加上 95% 信賴區間誤差線"""
+    fig = go.Figure(data=[
+        go.Bar(
+            y=words_df['詞彙'],
+            x=words_df['出現次數'],
+            orientation='h',
+            text=words_df['出現次數'],
+            textposition='auto',
+            error_x=dict(type='data', array=words_df['信賴區間']) if approx else None,
+            marker=dict(
+                color=words_df['出現次數'],
+                colorscale='Viridis',
+                showscale=False
+            )
+        )
+    ])
+
+    fig.update_layout(
+        title=f'前 20 名高頻詞彙 - {sentiment_label}評論',
+        xaxis_title='出現次數',
+        yaxis_title='詞彙',
+        height=600,
+        showlegend=False
+    )
+    return fig
+
+
+def star_distribution_figure(star_dist):
+    """星級分布長條圖"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=star_dist.index,
+        y=star_dist.values,
+        text=star_dist.values,
+        textposition='auto',
+        marker=dict(
+            color=['#f56565', '#fc8181', '#fbd38d', '#4299e1', '#48bb78'],
+            line=dict(color='white', width=2)
+        )
+    ))
+
+    fig.update_layout(
+        title='星級分布',
+        xaxis_title='星級',
+        yaxis_title='評論數',
+        height=400
+    )
+    return fig
+
+
+def sentiment_distribution_figure(sentiment_dist, labels):
+    """情感分布圓餅圖；labels 為 {情感代碼: 標籤}"""
+    sentiment_labels = [labels.get(k, '未知') for k in sentiment_dist.index]
+
+    fig = go.Figure(data=[go.Pie(
+        labels=sentiment_labels,
+        values=sentiment_dist.values,
+        hole=0.4,
+        marker=dict(
+            colors=['#f56565', '#ed8936', '#48bb78'],
+            line=dict(color='white', width=2)
+        ),
+        textfont=dict(size=14, color='white', family='Arial')
+    )])
+
+    fig.update_layout(
+        title='情感分布',
+        height=400
+    )
+    return fig
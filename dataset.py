@@ -0,0 +1,69 @@
+"""資料集載入（儀表板與 API 共用）
+
+載入分成兩個階段：
+    1. ingest_reviews：串流解析、驗證、補上情感分數，結果逐列獨立，存入版本化資料集
+    2. add_derived_columns：年月、評論者與近似重複群組等依整份資料計算的欄位，載入各版本時再算
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from aspect_scorer import fill_missing_scores
+from dedup import add_duplicate_clusters
+from reviewers import add_reviewer_columns
+from stream_reader import read_workbook
+from validation import validate_reviews
+
+DATA_PATH = 'chat_W_hotel.xlsx'
+
+ROW_KEY_COLUMN = '_row_key'
+ROW_HASH_COLUMN = '_row_hash'
+
+
+def source_fingerprint(path=DATA_PATH):
+    """以檔案大小與修改時間產生來源檔案的指紋（用來判斷是否需要重新載入）"""
+    stat = os.stat(path)
+    return hashlib.sha1(f"{stat.st_size}-{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def add_row_identity(df):
+    """加入列識別碼與內容雜湊
+
+    _row_key：有 idx 時以 idx 識別，否則以 (date, name) 識別，重複者再加上出現順序
+    _row_hash：整列原始內容的雜湊，用來判斷同一列是否被修改
+    """
+    has_idx = df['idx'].notna().to_numpy()
+    by_idx = pd.util.hash_pandas_object(df['idx'], index=False).to_numpy()
+    by_date_name = pd.util.hash_pandas_object(df[['date', 'name']], index=False).to_numpy()
+    identity = pd.Series(np.where(has_idx, by_idx, by_date_name))
+    occurrence = identity.groupby(identity).cumcount()
+    keys = pd.util.hash_pandas_object(pd.DataFrame({'identity': identity, 'occurrence': occurrence}), index=False)
+
+    df[ROW_HASH_COLUMN] = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    df[ROW_KEY_COLUMN] = keys.to_numpy()
+    return df
+
+
+def ingest_reviews(path=DATA_PATH):
+    """讀取原始評論並隔離不合格的列、補上缺少的情感分數，回傳 (資料, 隔離資料, 驗證報告)"""
+    # 串流解析活頁簿，避免 openpyxl 完整物件模型佔用大量記憶體
+    df = read_workbook(path)
+    df, quarantined, report = validate_reviews(df)
+    # 雜湊在補分前計算，評分規則調整不會讓每一列都被視為「已修改」
+    df = add_row_identity(df)
+    # 載入在儀表板與 API 的執行緒中進行，不可在多執行緒的伺服器中 fork 程序池；大量補分請用命令列
+    df = fill_missing_scores(df, workers=1)
+    return df, quarantined, report
+
+
+def add_derived_columns(df, minhash=None):
+    """加上年月、評論者與近似重複群組欄位（minhash 為與各列對齊的已存 MinHash 資料，可省略）"""
+    df['date'] = pd.to_datetime(df['date'])
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['year_month'] = df['date'].dt.to_period('M').astype(str)
+    df = add_reviewer_columns(df)
+    df = add_duplicate_clusters(df, minhash)
+    return df
@@ -0,0 +1,138 @@
+"""近似重複評論偵測：以 MinHash 簽章搭配 LSH 分桶，次二次方時間找出轉貼與近似複製的評論
+
+簽章與分桶鍵依版本化資料集的區段保存（見 versions.load_version_minhash），區段寫入後不再變動，
+來源檔更新時只需為新區段的列計算 MinHash；各版本的分群只讀取已存的分桶鍵，以排序找出同桶配對。
+"""
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+# 16 個 band x 每 band 8 列，門檻約為 (1/16)^(1/8) ≈ 0.71
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+# 估計 Jaccard 相似度達此值才視為重複
+DUPLICATE_THRESHOLD = 0.8
+# 太短的評論（例如「很棒」）重複很正常，不列入偵測
+MIN_SHINGLES = 10
+BATCH_SIZE = 5000
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingle_hashes(text):
+    """去除標點與空白後取字元 shingle，並以 crc32 雜湊（跨程序穩定）"""
+    cleaned = re.sub(r'[\W_]+', '', text.lower())
+    shingles = {cleaned[i:i+SHINGLE_SIZE] for i in range(len(cleaned) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(text):
+    """回傳長度 NUM_PERM 的 MinHash 簽章；文字太短時回傳 None"""
+    if not isinstance(text, str):
+        return None
+    hashes = _shingle_hashes(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def minhash_signatures(texts):
+    """計算每則評論的 MinHash 簽章，回傳 (簽章 (n, NUM_PERM) uint32, 是否有效)；太短的評論無效"""
+    signatures = np.zeros((len(texts), NUM_PERM), dtype=np.uint32)
+    valid = np.zeros(len(texts), dtype=bool)
+    for i, text in enumerate(texts):
+        signature = minhash_signature(text)
+        if signature is not None:
+            signatures[i] = signature
+            valid[i] = True
+    return signatures, valid
+
+
+def band_keys(signatures):
+    """每個 LSH band 的 LSH_ROWS 個簽章值合成一個 uint64 分桶鍵，回傳 (n, LSH_BANDS)"""
+    bands = signatures.reshape(len(signatures), LSH_BANDS, LSH_ROWS).astype(np.uint64)
+    keys = np.zeros((len(signatures), LSH_BANDS), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for r in range(LSH_ROWS):
+            # 多項式雜湊（溢位即 mod 2^64）；偶有碰撞也會在比對簽章時排除
+            keys = keys * np.uint64(0x100000001B3) + bands[:, :, r]
+    return keys
+
+
+def compute_minhash(texts):
+    """評論的 MinHash 資料 {'signatures', 'valid', 'bands'}（資料版本的每個區段只計算一次）"""
+    signatures, valid = minhash_signatures(texts)
+    return {'signatures': signatures, 'valid': valid, 'bands': band_keys(signatures)}
+
+
+def _candidate_pairs(bands, valid):
+    """同一個 band 分桶中的評論兩兩配對（列編號 i < j），不重複"""
+    rows = np.flatnonzero(valid)
+    pairs = []
+    for band in range(LSH_BANDS):
+        keys = np.asarray(bands[rows, band])
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+        # 大多數分桶只有一則評論，只展開有多則的分桶
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = np.sort(rows[order[start:start + size]])
+            i, j = np.triu_indices(size, k=1)
+            pairs.append(np.column_stack([members[i], members[j]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def cluster_ids(minhash):
+    """依 LSH 分桶找出候選配對，估計 Jaccard 相似度達門檻者合併為同一群組
+
+    回傳每則評論的群組代號（群組中最小的列編號）。只讀取已存的簽章與分桶鍵，不重新計算 MinHash。
+    """
+    n = len(minhash['valid'])
+    if n == 0:
+        return np.array([], dtype=np.int64)
+    pairs = _candidate_pairs(minhash['bands'], np.asarray(minhash['valid']))
+    keep = np.zeros(len(pairs), dtype=bool)
+    for start in range(0, len(pairs), BATCH_SIZE):
+        chunk = pairs[start:start + BATCH_SIZE]
+        agreement = (minhash['signatures'][chunk[:, 0]] == minhash['signatures'][chunk[:, 1]]).mean(axis=1)
+        keep[start:start + BATCH_SIZE] = agreement >= DUPLICATE_THRESHOLD
+    edges = pairs[keep]
+
+    graph = sparse.coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    # 以群組中最小的列編號作為群組代號
+    first = np.full(labels.max() + 1, n, dtype=np.int64)
+    np.minimum.at(first, labels, np.arange(n))
+    return first[labels]
+
+
+def add_duplicate_clusters(df, minhash=None):
+    """加入 dup_cluster（群組代號）與 dup_canonical（是否為整份資料中群組日期最早的一則）欄位
+
+    minhash 為與 df 各列對齊的 compute_minhash 結果（版本化資料集依區段保存，只有新區段需要計算）；
+    未提供時直接由 df['text'] 計算。篩選時的合併以 analytics.filter_mask 在篩選範圍內重新決定
+    保留哪一則，dup_canonical 只供無法逐列判斷的分格彙總（驅動因素、片語）使用。
+    """
+    if minhash is None:
+        minhash = compute_minhash(df['text'].tolist())
+    clusters = cluster_ids(minhash)
+    order = np.argsort(df['date'].to_numpy(), kind='stable')
+    canonical = np.zeros(len(df), dtype=bool)
+    canonical[order] = ~pd.Series(clusters[order]).duplicated().to_numpy()
+    df['dup_cluster'] = clusters
+    df['dup_canonical'] = canonical
+    return df
@@ -0,0 +1,120 @@
+"""維度驅動因素分析：哪些 r_sentiment.* 面向最能解釋 star
+
+載入時依 (年月, 星級, 情感, 是否為重複群組代表, 是否為重複評論者) 分格預先計算
+交叉乘積矩陣（充分統計量）。任意篩選範圍只需加總對應格子的 8x8 矩陣，
+以成對完整（pairwise complete）相關矩陣解出 ridge 迴歸與偏相關，不必重新掃描原始資料。
+"""
+import numpy as np
+import pandas as pd
+
+from analytics import DIMENSIONS, DIMENSION_NAMES
+
+DRIVER_VARIABLES = ['star'] + DIMENSIONS
+# 兩個變數同時有值的筆數少於此數時，視為無相關
+MIN_PAIR_COUNT = 5
+# 預先彙總的格子鍵（片語統計也使用相同的分格）
+CELL_COLUMNS = ['year_month', 'star', 'sentiment', 'dup_canonical', 'repeat']
+
+
+def build_cell_keys(df):
+    """依 CELL_COLUMNS 分格，回傳 (格子表, 每列的格子編號)；鍵有缺值的列編號為 -1"""
+    keys = pd.DataFrame({
+        'year_month': df['year_month'],
+        'star': df['star'],
+        'sentiment': df['sentiment'],
+        'dup_canonical': df['dup_canonical'],
+        'repeat': df['reviewer_count'] > 1
+    })
+    groups = keys.groupby(CELL_COLUMNS, dropna=True).indices
+    cell_ids = np.full(len(df), -1, dtype=np.int64)
+    for i, rows in enumerate(groups.values()):
+        cell_ids[rows] = i
+    return pd.DataFrame(list(groups.keys()), columns=CELL_COLUMNS), cell_ids
+
+
+def build_driver_stats(df):
+    """計算每格的成對計數 N、成對和 S、交叉乘積 Q 與成對平方和 R（皆為 8x8）"""
+    keys, cell_ids = build_cell_keys(df)
+    values = df[DRIVER_VARIABLES].to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    mask = present.astype(float)
+
+    size = len(DRIVER_VARIABLES)
+    N, S, Q, R = (np.zeros((len(keys), size, size)) for _ in range(4))
+    # 依格子編號排序後切段，避免逐格掃描整個陣列
+    order = np.argsort(cell_ids, kind='stable')
+    bounds = np.searchsorted(cell_ids[order], np.arange(len(keys) + 1))
+    for i in range(len(keys)):
+        rows = order[bounds[i]:bounds[i + 1]]
+        m, x = mask[rows], filled[rows]
+        # N[i,j] = Σ m_i m_j；S[i,j] = Σ x_i m_j；Q[i,j] = Σ x_i x_j；R[i,j] = Σ x_i² m_j
+        N[i] = m.T @ m
+        S[i] = x.T @ m
+        Q[i] = x.T @ x
+        R[i] = (x * x).T @ m
+
+    return {'keys': keys, 'N': N, 'S': S, 'Q': Q, 'R': R}
+
+
+def cell_mask(stats, start_month, end_month, stars, sentiments, collapse_duplicates=False, repeat_reviewers=None):
+    """依篩選條件選出要加總的格子（日期以月份為單位）"""
+    keys = stats['keys']
+    mask = (
+        (keys['year_month'] >= start_month) &
+        (keys['year_month'] <= end_month) &
+        keys['star'].isin(stars) &
+        keys['sentiment'].isin(sentiments)
+    )
+    # 格子無法依篩選範圍逐列決定保留哪一則重複評論，這裡以整份資料中每群組最早的一則為準（近似）
+    if collapse_duplicates:
+        mask &= keys['dup_canonical']
+    if repeat_reviewers == 'only':
+        mask &= keys['repeat']
+    elif repeat_reviewers == 'exclude':
+        mask &= ~keys['repeat']
+    return mask.to_numpy()
+
+
+def _pairwise_correlation(N, S, Q, R):
+    """由充分統計量算出成對完整的相關矩陣與成對樣本數"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = Q - S * S.T / N
+        var_i = R - S ** 2 / N
+        var_j = var_i.T
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[(N < MIN_PAIR_COUNT) | ~np.isfinite(corr)] = 0.0
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def driver_analysis(stats, mask, ridge=0.1):
+    """回傳各維度對星級的相關係數、偏相關與標準化 ridge 迴歸係數，以及 R² 與樣本數"""
+    N = stats['N'][mask].sum(axis=0)
+    S = stats['S'][mask].sum(axis=0)
+    Q = stats['Q'][mask].sum(axis=0)
+    R = stats['R'][mask].sum(axis=0)
+
+    corr = _pairwise_correlation(N, S, Q, R)
+    regularized = corr + ridge * np.eye(len(corr))
+    regularized[0, 0] = corr[0, 0]
+
+    # 標準化迴歸係數：(C_xx + λI)^-1 C_xy
+    c_xx, c_xy = regularized[1:, 1:], corr[1:, 0]
+    beta = np.linalg.pinv(c_xx) @ c_xy
+    r_squared = float(beta @ c_xy)
+
+    # 偏相關：由（加入 ridge 的）相關矩陣反矩陣求得
+    precision = np.linalg.pinv(regularized)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        partial = -precision[0, 1:] / np.sqrt(precision[0, 0] * np.diag(precision)[1:])
+    partial = np.nan_to_num(partial)
+
+    result = pd.DataFrame({
+        '維度': DIMENSION_NAMES,
+        '與星級相關係數': corr[1:, 0],
+        '偏相關係數': partial,
+        '標準化迴歸係數': beta,
+        '樣本數': N[1:, 0].astype(int)
+    })
+    return result, r_squared, int(N[0, 0])
@@ -0,0 +1,108 @@
+"""各維度的高頻片語：從 reasons.* 欄位擷取，依對應 r_sentiment.* 的正負號分開統計
+
+載入時依驅動因素分析相同的格子（年月、星級、情感、重複群組代表、重複評論者）
+再加上維度情感，預先計算每個片語的評論數。切換維度或情感只需加總對應的列，
+不必重新掃描評論文字。
+"""
+import numpy as np
+import pandas as pd
+
+from analytics import DIMENSIONS, STOP_WORDS, extract_words
+from drivers import CELL_COLUMNS, build_cell_keys
+from similarity import EMPTY_REASONS
+
+# 較長片語的評論數達到短片語的此比例時，省略短片語（如「務人」與「務人員」）
+SUBSUME_RATIO = 0.8
+
+
+def reasons_column(dimension):
+    """r_sentiment.X -> reasons.X"""
+    return 'reasons.' + dimension[len('r_sentiment.'):]
+
+
+def _phrases(text):
+    """單則 reasons 中出現的片語（同一則評論只計一次）"""
+    if not isinstance(text, str) or text.strip() in EMPTY_REASONS:
+        return []
+    return sorted({w for w in extract_words(text) if len(w) >= 2 and w not in STOP_WORDS})
+
+
+def build_phrase_arrays(df):
+    """計算各維度每格的片語評論數，攤平成可存成 .npy 的陣列 {鍵: 陣列}
+
+    片語以編號儲存（對應 vocabulary），格子表存成 keys.<欄位>，各維度的計數存成
+    counts.<維度序號>.<cell|dim_sentiment|phrase|count>。
+    """
+    keys, cell_ids = build_cell_keys(df)
+    tables = {}
+    for i, dimension in enumerate(DIMENSIONS):
+        column = reasons_column(dimension)
+        if column not in df.columns:
+            continue
+        scored = df[dimension].notna().to_numpy() & df[column].notna().to_numpy()
+        rows = np.flatnonzero(scored & (cell_ids >= 0))
+
+        long = pd.DataFrame({
+            'cell': cell_ids[rows],
+            'dim_sentiment': np.sign(df[dimension].to_numpy()[rows]),
+            'phrase': [_phrases(t) for t in df[column].to_numpy()[rows]] if len(rows) else []
+        }).explode('phrase').dropna(subset=['phrase'])
+        tables[i] = long.groupby(['cell', 'dim_sentiment', 'phrase']).size().rename('count').reset_index()
+
+    all_phrases = [table['phrase'] for table in tables.values()]
+    vocabulary = np.unique(pd.concat(all_phrases).to_numpy(dtype=str)) if all_phrases else np.array([], dtype=str)
+    arrays = {'vocabulary': vocabulary}
+    for column in keys.columns:
+        values = keys[column].to_numpy()
+        arrays[f"keys.{column}"] = values.astype(str) if values.dtype == object else values
+    for i, table in tables.items():
+        arrays[f"counts.{i}.cell"] = table['cell'].to_numpy(dtype=np.int64)
+        arrays[f"counts.{i}.dim_sentiment"] = table['dim_sentiment'].to_numpy(dtype=float)
+        arrays[f"counts.{i}.phrase"] = np.searchsorted(vocabulary, table['phrase'].to_numpy(dtype=str)).astype(np.int32)
+        arrays[f"counts.{i}.count"] = table['count'].to_numpy(dtype=np.int64)
+    return arrays
+
+
+def phrase_counts_from_arrays(arrays):
+    """由 build_phrase_arrays 的陣列（可為唯讀 mmap）組回
+    {'keys': 格子表, 'vocabulary': 片語, 'counts': {維度欄位: {cell, dim_sentiment, phrase, count}}}"""
+    keys = pd.DataFrame({column: np.asarray(arrays[f"keys.{column}"]) for column in CELL_COLUMNS})
+    counts = {}
+    for i, dimension in enumerate(DIMENSIONS):
+        if f"counts.{i}.cell" in arrays:
+            counts[dimension] = {
+                field: arrays[f"counts.{i}.{field}"] for field in ('cell', 'dim_sentiment', 'phrase', 'count')
+            }
+    return {'keys': keys, 'vocabulary': arrays['vocabulary'], 'counts': counts}
+
+
+def top_phrases(phrase_counts, dimension, cells, dim_sentiment=None, top_n=15, min_count=2):
+    """加總選定格子的片語數，回傳 DataFrame[片語, 評論數]
+
+    dim_sentiment 為 1 / 0 / -1（None 表示不分情感）。被較長片語涵蓋、且次數相近的
+    短片語會被省略，例如「服務人」與「服務人員」只保留後者。
+    """
+    table = phrase_counts['counts'].get(dimension)
+    if table is None:
+        return pd.DataFrame(columns=['片語', '評論數'])
+    selected = cells[table['cell']]
+    if dim_sentiment is not None:
+        selected = selected & (table['dim_sentiment'] == dim_sentiment)
+
+    vocabulary = phrase_counts['vocabulary']
+    totals = np.bincount(table['phrase'][selected], weights=table['count'][selected], minlength=len(vocabulary))
+    # 片語編號依字典序排列，穩定排序可讓同次數的片語維持固定順序
+    candidates = np.flatnonzero(totals >= min_count)
+    candidates = candidates[np.argsort(-totals[candidates], kind='stable')]
+
+    # 片語的評論數不會少於包含它的較長片語，因此只需與次數相近（較少）的片語比較
+    phrases, values = vocabulary[candidates], totals[candidates]
+    kept = []
+    for i, (phrase, count) in enumerate(zip(phrases, values)):
+        if len(kept) >= top_n:
+            break
+        end = np.searchsorted(-values, -count * SUBSUME_RATIO, side='right')
+        if any(len(other) > len(phrase) and phrase in other for other in phrases[:end]):
+            continue
+        kept.append((str(phrase), int(count)))
+    return pd.DataFrame(kept, columns=['片語', '評論數'])
@@ -0,0 +1,71 @@
+"""評論者索引：正規化姓名 -> 雜湊代號 -> 列位置，支援重複評論者分析"""
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from analytics import DIMENSIONS, DIMENSION_NAMES
+
+
+def normalize_name(name):
+    """全形轉半形、去除多餘空白並忽略大小寫"""
+    if not isinstance(name, str):
+        return ''
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', name)).strip().casefold()
+
+
+def reviewer_hash(name):
+    """正規化姓名的 64 位元雜湊（跨程序穩定）；空白姓名回傳 0"""
+    normalized = normalize_name(name)
+    if not normalized:
+        return 0
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def add_reviewer_columns(df):
+    """加入 reviewer_id（姓名雜湊）與 reviewer_count（該評論者的總評論數）欄位"""
+    df['reviewer_id'] = np.array([reviewer_hash(n) for n in df['name']], dtype=np.int64)
+    counts = df['reviewer_id'].map(df['reviewer_id'].value_counts())
+    df['reviewer_count'] = np.where(df['reviewer_id'] == 0, 1, counts).astype(np.int64)
+    return df
+
+
+def build_reviewer_index(df):
+    """reviewer_id -> 列位置陣列（依日期排序）的雜湊表"""
+    order = np.argsort(df['date'].to_numpy(), kind='stable')
+    ids = df['reviewer_id'].to_numpy()[order]
+    index = {}
+    for reviewer_id, positions in pd.Series(order).groupby(ids).indices.items():
+        if reviewer_id != 0:
+            index[reviewer_id] = order[positions]
+    return index
+
+
+def reviewer_positions(index, name):
+    """以姓名查詢該評論者的列位置（O(1) 雜湊查表）"""
+    return index.get(reviewer_hash(name), np.array([], dtype=np.int64))
+
+
+def top_repeat_reviewers(df, n=10):
+    """篩選範圍內評論數最多的重複評論者"""
+    repeat = df[(df['reviewer_id'] != 0) & (df['reviewer_count'] > 1)]
+    if len(repeat) == 0:
+        return pd.DataFrame(columns=['reviewer_id', '姓名', '評論數', '平均星級', '最近評論'])
+    summary = repeat.groupby('reviewer_id').agg(
+        姓名=('name', 'first'),
+        評論數=('star', 'size'),
+        平均星級=('star', 'mean'),
+        最近評論=('date', 'max')
+    ).reset_index()
+    summary = summary[summary['評論數'] > 1]
+    return summary.sort_values(['評論數', '最近評論'], ascending=False).head(n)
+
+
+def reviewer_dimension_trend(reviews):
+    """評論者每則評論的星級與各維度分數（依日期排序）"""
+    trend = reviews[['date', 'star'] + DIMENSIONS].sort_values('date')
+    trend.columns = ['日期', '星級'] + DIMENSION_NAMES
+    return trend
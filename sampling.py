@@ -0,0 +1,139 @@
+"""近似模式：依 (年月, 星級) 分層抽樣，並以加權估計量計算 KPI、維度平均與詞頻的信賴區間"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analytics import DIMENSIONS, DIMENSION_NAMES, STOP_WORDS, extract_words
+
+# 每層抽樣比例與最少樣本數
+SAMPLE_RATE = 0.05
+MIN_PER_STRATUM = 30
+# 估計的篩選筆數低於此值時自動改回精確計算
+APPROX_MIN_ROWS = 20000
+# 95% 信賴區間
+Z_95 = 1.96
+
+
+def build_stratified_sample(df, rate=SAMPLE_RATE, min_per_stratum=MIN_PER_STRATUM, seed=42):
+    """依 (year_month, star) 分層抽樣，附上層別、層大小與抽樣權重欄位"""
+    strata = df['year_month'].fillna('NA').astype(str) + '|' + df['star'].fillna(-1).astype(str)
+    stratum_size = strata.map(strata.value_counts())
+
+    # 每層抽樣數：max(最少樣本數, 比例)，但不超過層大小
+    target = np.minimum(
+        np.maximum(np.ceil(stratum_size * rate), min_per_stratum),
+        stratum_size
+    )
+
+    # 以隨機排序後的層內名次決定是否入樣（等同層內簡單隨機抽樣）
+    rng = np.random.default_rng(seed)
+    order = pd.Series(rng.random(len(df)), index=df.index)
+    rank = order.groupby(strata).rank(method='first')
+    in_sample = rank <= target
+
+    sample = df[in_sample].copy()
+    sample['_stratum'] = strata[in_sample]
+    sample['_stratum_size'] = stratum_size[in_sample]
+    sample['_weight'] = stratum_size[in_sample] / target[in_sample]
+    return sample
+
+
+def estimate_domain_size(sample, mask):
+    """估計符合篩選條件的母體筆數"""
+    return float((sample['_weight'].to_numpy() * np.asarray(mask, dtype=float)).sum())
+
+
+def _stratified_total_variance(sample, z):
+    """分層簡單隨機抽樣下總和估計量的變異數；z 為二維（列 × 變數）時逐欄計算"""
+    z = np.asarray(z, dtype=float)
+    grouped = pd.DataFrame(z.reshape(len(sample), -1), index=sample.index).groupby(sample['_stratum'])
+    s2 = grouped.var(ddof=1).fillna(0.0)
+    n_h = grouped.size()
+    N_h = sample.groupby('_stratum')['_stratum_size'].first()
+    variance = s2.mul(N_h ** 2 * (1 - n_h / N_h) / n_h, axis=0).sum().to_numpy()
+    return variance if z.ndim == 2 else float(variance[0])
+
+
+def estimate_total(sample, values, mask):
+    """加權總和估計，回傳 (估計值, 95% 信賴區間半寬)"""
+    z = np.where(np.asarray(mask), np.asarray(values, dtype=float), 0.0)
+    total = float((sample['_weight'].to_numpy() * z).sum())
+    return total, Z_95 * np.sqrt(_stratified_total_variance(sample, z))
+
+
+def estimate_mean(sample, values, mask):
+    """子母體平均（比率估計量），缺值不計入，回傳 (估計值, 95% 信賴區間半寬)"""
+    y = np.asarray(values, dtype=float)
+    valid = np.asarray(mask) & ~np.isnan(y)
+    w = sample['_weight'].to_numpy()
+    n_hat = (w * valid).sum()
+    if n_hat == 0:
+        return np.nan, np.nan
+
+    y = np.where(valid, y, 0.0)
+    ratio = (w * y).sum() / n_hat
+    # 線性化：z = d * (y - R)
+    z = np.where(valid, y - ratio, 0.0)
+    return float(ratio), Z_95 * np.sqrt(_stratified_total_variance(sample, z)) / n_hat
+
+
+def approx_kpis(sample, mask):
+    """以樣本估計 KPI 指標卡，各值為 (估計值, 信賴區間半寬)"""
+    sentiment = sample['sentiment'].to_numpy()
+    total = estimate_total(sample, np.ones(len(sample)), mask)
+    avg_star = estimate_mean(sample, sample['star'], mask)
+    positive = estimate_mean(sample, (sentiment == 1.0).astype(float), mask)
+    negative = estimate_mean(sample, (sentiment == -1.0).astype(float), mask)
+
+    dates = sample.loc[np.asarray(mask), 'date']
+    return {
+        'total': total,
+        'avg_star': avg_star,
+        'positive_pct': (positive[0] * 100, positive[1] * 100),
+        'negative_pct': (negative[0] * 100, negative[1] * 100),
+        'date_span': (dates.max() - dates.min()).days if len(dates) > 0 else 0
+    }
+
+
+def approx_dimension_averages(sample, mask):
+    """以樣本估計各維度平均情感分數，附 95% 信賴區間半寬"""
+    rows = [estimate_mean(sample, sample[dim], mask) for dim in DIMENSIONS]
+    return pd.DataFrame({
+        '維度': DIMENSION_NAMES,
+        '平均分數': [r[0] for r in rows],
+        '信賴區間': [r[1] for r in rows]
+    }).sort_values('平均分數', ascending=True)
+
+
+def approx_word_freq(sample, mask, min_count=3, top_n=30):
+    """以樣本加權估計高頻詞出現次數，回傳欄位為 詞彙、出現次數、信賴區間 的 DataFrame
+
+    斷詞方式與 compute_word_freq 相同（逐則評論擷取），兩種模式估計的是同一個量。
+    """
+    texts = sample['text'].where(np.asarray(mask)).to_numpy()
+
+    # 評論 × 詞彙的稀疏計數矩陣（重複的 (列, 詞) 在建立時自動加總）
+    rows, cols, vocabulary = [], [], {}
+    for i, text in enumerate(texts):
+        if not isinstance(text, str):
+            continue
+        for word in extract_words(text):
+            if word not in STOP_WORDS:
+                rows.append(i)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(sample), len(vocabulary))
+    )
+
+    weighted = counts.T @ sample['_weight'].to_numpy()
+    top = [j for j in np.argsort(-weighted, kind='stable')[:top_n] if weighted[j] >= min_count]
+    if not top:
+        return pd.DataFrame(columns=['詞彙', '出現次數', '信賴區間'])
+
+    words = list(vocabulary)
+    half_widths = Z_95 * np.sqrt(_stratified_total_variance(sample, counts[:, top].toarray()))
+    return pd.DataFrame({
+        '詞彙': [words[j] for j in top],
+        '出現次數': [round(weighted[j]) for j in top],
+        '信賴區間': half_widths
+    })
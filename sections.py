@@ -0,0 +1,34 @@
+"""儀表板區塊的平行計算：先宣告各區塊的計算與輸入，一起送出執行，渲染時再依頁面順序取回結果
+
+pandas / NumPy / Arrow 的向量化運算大多會釋放 GIL，交給執行緒池即可。
+不使用程序池：Streamlit 伺服器本身是多執行緒的，在其中 fork 可能因其他執行緒持有的鎖而卡住；
+純 Python 的詞頻統計若送到子程序，還得每次重新序列化整欄評論文字，成本不低於計算本身。
+區塊計算不可呼叫 st.*，只能是唯讀的彙總。
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+SECTION_THREADS = min(8, (os.cpu_count() or 1) + 4)
+
+
+def create_pool():
+    """建立區塊計算用的執行緒池"""
+    return ThreadPoolExecutor(max_workers=SECTION_THREADS, thread_name_prefix='section')
+
+
+class SectionTasks:
+    """一次重新執行（rerun）中的區塊計算排程"""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._futures = {}
+
+    def add(self, name, func, *inputs):
+        """宣告區塊計算並立即送出"""
+        if name in self._futures:
+            raise ValueError(f"重複的區塊名稱: {name}")
+        self._futures[name] = self._pool.submit(func, *inputs)
+
+    def result(self, name):
+        """等待並取回區塊結果；計算時的例外會在此重新拋出"""
+        return self._futures[name].result()
@@ -0,0 +1,125 @@
+"""多個伺服器程序共用的記憶體映射資料集
+
+版本化資料集中的某個版本加上衍生欄位後寫成未壓縮的 Arrow IPC 檔，各程序以唯讀方式 mmap 後
+直接把數值欄位的緩衝區包成 NumPy / pandas 欄位（不複製），同一台主機的
+page cache 只保留一份實體資料。文字欄位需 pandas 3 以上（預設的 str 型別以 Arrow 儲存）
+才能零複製；pandas 2 會轉成 Python 物件陣列，在每個程序各複製一份。
+
+由資料集衍生的索引（TF-IDF 矩陣、片語計數等）以 open_shared_arrays 寫成一組 .npy 檔，
+同樣以唯讀 mmap 開啟，記憶體用量不隨程序數增加。
+
+預先建立（選用，否則第一個程序會自動建立）：
+    python shared_store.py
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from dataset import DATA_PATH, add_derived_columns
+from versions import current_version, load_version, load_version_minhash
+
+STORE_DIR = '.data_cache'
+# 欄位或格式變更時遞增，避免讀到舊格式的檔案
+STORE_FORMAT = 8
+
+
+def store_path(version):
+    return os.path.join(STORE_DIR, f"reviews-{version}-f{STORE_FORMAT}.arrow")
+
+
+def _to_arrow(df):
+    """轉為 Arrow Table；日期存成 int64、布林存成 uint8、數值保留 NaN，讀取時才能零複製"""
+    arrays, fields, dtypes = [], [], {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = series.to_numpy()
+            dtypes[col] = str(values.dtype)
+            arrays.append(pa.array(values.view('int64')))
+        elif pd.api.types.is_bool_dtype(series):
+            dtypes[col] = 'bool'
+            arrays.append(pa.array(series.to_numpy().view('uint8')))
+        elif pd.api.types.is_numeric_dtype(series):
+            arrays.append(pa.array(series.to_numpy(), from_pandas=False))
+        else:
+            arrays.append(pa.array(series.astype(object), type=pa.large_string(), from_pandas=True))
+        fields.append(pa.field(col, arrays[-1].type))
+
+    schema = pa.schema(fields, metadata={'view_dtypes': json.dumps(dtypes)})
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def build_store(version):
+    """讀取指定版本並寫成 Arrow 檔（先寫暫存檔再原子替換，多程序同時建立也安全）"""
+    target = store_path(version)
+    os.makedirs(STORE_DIR, exist_ok=True)
+
+    table = _to_arrow(add_derived_columns(load_version(version), load_version_minhash(version)))
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, target)
+    return target
+
+
+def open_shared(version=None, path=DATA_PATH):
+    """以唯讀 mmap 開啟指定版本（預設為來源檔目前的版本）的資料集，回傳 (版本, DataFrame)"""
+    version = version or current_version(path)
+    target = store_path(version)
+    if not os.path.exists(target):
+        build_store(version)
+
+    # 使用 mmap 讀取：Table 的緩衝區直接指向映射的檔案頁面
+    table = pa.ipc.open_file(pa.memory_map(target, 'r')).read_all()
+    view_dtypes = json.loads(table.schema.metadata[b'view_dtypes'])
+
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        # 寫入時只有一個 record batch；combine_chunks 會複製，故直接取用
+        chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        if pa.types.is_large_string(chunk.type):
+            # pandas 3 的 str 型別直接包住 Arrow 陣列（不複製）
+            columns[name] = pd.Series(chunk.to_pandas())
+        else:
+            values = chunk.to_numpy(zero_copy_only=True)
+            if name in view_dtypes:
+                values = values.view(view_dtypes[name])
+            columns[name] = values
+    return version, pd.DataFrame(columns, copy=False)
+
+
+def shared_arrays_path(version, name):
+    return os.path.join(STORE_DIR, f"{name}-{version}-f{STORE_FORMAT}")
+
+
+def open_shared_arrays(version, name, build):
+    """以唯讀 mmap 開啟由資料集衍生的陣列集合 {鍵: NumPy 陣列}；尚未建立時以 build(df) 建立
+
+    每個陣列存成目錄中的一個 .npy 檔（不可為 object 型別），整個目錄寫好後再原子更名。
+    """
+    target = shared_arrays_path(version, name)
+    if not os.path.exists(target):
+        arrays = build(open_shared(version)[1])
+        tmp = f"{target}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for key, values in arrays.items():
+            np.save(os.path.join(tmp, f"{key}.npy"), np.asarray(values), allow_pickle=False)
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # 其他程序已先建立完成
+            shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        file[:-len('.npy')]: np.load(os.path.join(target, file), mmap_mode='r')
+        for file in os.listdir(target) if file.endswith('.npy')
+    }
+
+
+if __name__ == '__main__':
+    print(f"已建立共用資料集: {build_store(current_version())}")
@@ -0,0 +1,158 @@
+"""相似評論檢索：以字元 n-gram TF-IDF 稀疏向量計算餘弦相似度（不需外部模型或網路）"""
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+# 建立向量的欄位：完整評論與各維度相關評論
+REASON_COLUMNS = [
+    'reasons.Staff Service',
+    'reasons.Location',
+    'reasons.Room & Bathroom Quality',
+    'reasons.Environment',
+    'reasons.Facilities',
+    'reasons.Food & Beverage',
+    'reasons.Value'
+]
+SIMILARITY_FIELDS = ['text'] + REASON_COLUMNS
+
+NGRAM_RANGE = (2, 3)
+# 只出現在一則評論的 n-gram 無助於找相似評論，直接略過
+MIN_DF = 2
+# 候選評論超過此數量時改用近似索引
+APPROX_MIN_CANDIDATES = 50000
+# 近似索引：只比對與查詢共享前幾個高權重 n-gram 的評論
+APPROX_QUERY_TERMS = 8
+
+# reasons.* 中代表「沒有相關內容」的值
+EMPTY_REASONS = {'無', '无', 'None', 'nan'}
+
+
+def _char_ngrams(text):
+    """去除標點與空白後擷取字元 n-gram"""
+    cleaned = re.sub(r'[\W_]+', '', text)
+    grams = []
+    for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+        grams.extend(cleaned[i:i+n] for i in range(len(cleaned) - n + 1))
+    return grams
+
+
+def build_tfidf(texts):
+    """將文字序列轉為 L2 正規化的 TF-IDF CSR 矩陣（列 = 評論）"""
+    counts = []
+    doc_freq = Counter()
+    for text in texts:
+        if not isinstance(text, str) or text.strip() in EMPTY_REASONS:
+            counts.append(Counter())
+            continue
+        c = Counter(_char_ngrams(text))
+        counts.append(c)
+        doc_freq.update(c.keys())
+
+    vocab = {}
+    for gram, df_count in doc_freq.items():
+        if df_count >= MIN_DF:
+            vocab[gram] = len(vocab)
+
+    indptr = [0]
+    indices = []
+    data = []
+    for c in counts:
+        for gram, tf in c.items():
+            col = vocab.get(gram)
+            if col is not None:
+                indices.append(col)
+                data.append(1.0 + np.log(tf))
+        indptr.append(len(indices))
+
+    n_docs = len(counts)
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(n_docs, len(vocab))
+    )
+
+    # 平滑化 IDF，再做列正規化
+    df_array = np.zeros(len(vocab), dtype=np.float32)
+    for gram, col in vocab.items():
+        df_array[col] = doc_freq[gram]
+    idf = np.log((1 + n_docs) / (1 + df_array)) + 1
+    matrix = matrix @ sparse.diags(idf.astype(np.float32))
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def build_similarity_arrays(df):
+    """為 text 與各 reasons.* 欄位建立 TF-IDF 矩陣，攤平成可存成 .npy 的陣列 {鍵: 陣列}
+
+    鍵為 <欄位序號>.<csr|csc>.<data|indices|indptr> 與 <欄位序號>.shape。
+    """
+    arrays = {}
+    for i, field in enumerate(SIMILARITY_FIELDS):
+        if field not in df.columns:
+            continue
+        csr = build_tfidf(df[field])
+        for layout, matrix in (('csr', csr), ('csc', csr.tocsc())):
+            # 先排序好索引，開啟後的唯讀矩陣就不需要原地排序
+            matrix.sort_indices()
+            arrays[f"{i}.{layout}.data"] = matrix.data
+            arrays[f"{i}.{layout}.indices"] = matrix.indices
+            arrays[f"{i}.{layout}.indptr"] = matrix.indptr
+        arrays[f"{i}.shape"] = np.array(csr.shape, dtype=np.int64)
+    return arrays
+
+
+def similarity_index_from_arrays(arrays):
+    """由 build_similarity_arrays 的陣列（可為唯讀 mmap）組回索引，CSR 供查詢、CSC 供近似候選篩選"""
+    index = {}
+    for i, field in enumerate(SIMILARITY_FIELDS):
+        if f"{i}.shape" not in arrays:
+            continue
+        shape = tuple(int(n) for n in arrays[f"{i}.shape"])
+        index[field] = {}
+        for layout, cls in (('csr', sparse.csr_matrix), ('csc', sparse.csc_matrix)):
+            matrix = cls(
+                (arrays[f"{i}.{layout}.data"], arrays[f"{i}.{layout}.indices"], arrays[f"{i}.{layout}.indptr"]),
+                shape=shape, copy=False
+            )
+            matrix.has_sorted_indices = True
+            index[field][layout] = matrix
+    return index
+
+
+def find_similar(index, field, position, candidate_mask, k=10, approximate=None):
+    """找出與第 position 列最相似的前 k 則評論（限 candidate_mask 內），回傳 (列位置陣列, 相似度陣列)"""
+    matrix = index[field]['csr']
+    query = matrix[position]
+    if query.nnz == 0:
+        return np.array([], dtype=int), np.array([])
+
+    candidate_mask = np.asarray(candidate_mask, dtype=bool).copy()
+    candidate_mask[position] = False
+    if approximate is None:
+        approximate = candidate_mask.sum() > APPROX_MIN_CANDIDATES
+
+    if approximate:
+        # 依查詢中權重最高的 n-gram 取出倒排列表，只重新計分這些候選
+        top_terms = query.indices[np.argsort(query.data)[::-1][:APPROX_QUERY_TERMS]]
+        postings = index[field]['csc'][:, top_terms]
+        shares_term = np.zeros(matrix.shape[0], dtype=bool)
+        shares_term[postings.indices] = True
+        candidate_mask &= shares_term
+
+    candidates = np.flatnonzero(candidate_mask)
+    if len(candidates) == 0:
+        return np.array([], dtype=int), np.array([])
+
+    # 稀疏矩陣乘法：近似模式只乘候選列，精確模式整個矩陣乘一次再取候選
+    if approximate:
+        scores = (matrix[candidates] @ query.T).toarray().ravel()
+    else:
+        scores = (matrix @ query.T).toarray().ravel()[candidates]
+    keep = scores > 0
+    candidates, scores = candidates[keep], scores[keep]
+
+    top = np.argpartition(scores, -k)[-k:] if len(scores) > k else np.arange(len(scores))
+    top = top[np.argsort(scores[top])[::-1]]
+    return candidates[top], scores[top]
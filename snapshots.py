@@ -0,0 +1,234 @@
+"""預先產生的靜態報表快照：每個時間快捷選項一份自含的 HTML（內嵌 Plotly JSON 與 plotly.js）
+
+快照包含 KPI、趨勢、維度、高頻詞與分布（預設篩選：全部星級與情感）。儀表板在背景執行緒中
+逐一產生目前資料版本的快照，命令列則以程序池平行產生。儀表板在使用者調整篩選條件之前
+直接讀取快照內嵌的 JSON 顯示，不必執行完整的計算流程。HTML 檔本身也可以直接用瀏覽器開啟或寄送。
+
+    python snapshots.py --workers 4      # 為目前的資料版本產生快照
+"""
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from analytics import (
+    filter_mask,
+    compute_kpis,
+    compute_monthly_trend,
+    compute_yearly_trend,
+    compute_sentiment_trend,
+    compute_dimension_averages,
+    compute_word_freq,
+    preset_date_range,
+    SENTIMENT_LABELS,
+    TIME_PRESETS
+)
+from charts import (
+    monthly_trend_figure,
+    yearly_trend_figure,
+    sentiment_trend_figure,
+    dimension_figure,
+    radar_figure,
+    word_freq_figure,
+    star_distribution_figure,
+    sentiment_distribution_figure
+)
+from shared_store import open_shared
+from versions import current_version
+
+SNAPSHOT_DIR = os.path.join('.data_cache', 'snapshots')
+# 快照檔名（時間快捷選項 -> 英文代稱）
+PRESET_FILES = {
+    "最近 30 天": 'last-30-days',
+    "最近 3 個月": 'last-3-months',
+    "最近 6 個月": 'last-6-months',
+    "最近 1 年": 'last-1-year',
+    "今年": 'this-year',
+    "全部": 'all'
+}
+# 快照中的圖表依此順序排列
+FIGURE_ORDER = ['monthly', 'yearly', 'sentiment_trend', 'dimensions', 'radar', 'keywords', 'star_dist', 'sentiment_dist']
+
+_DATA_PATTERN = re.compile(r'<script type="application/json" id="snapshot-data">(.*?)</script>', re.S)
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<title>W Hotel 客戶評價分析 - {preset}</title>
+<style>
+    body {{ font-family: sans-serif; margin: 2rem auto; max-width: 1400px; color: #2d3748; }}
+    h1 {{ text-align: center; color: #667eea; }}
+    h3 {{ border-bottom: 3px solid #667eea; padding-bottom: 0.5rem; margin-top: 2rem; }}
+    .meta {{ text-align: center; color: #718096; }}
+    .kpis {{ display: grid; grid-template-columns: repeat(5, 1fr); gap: 1rem; }}
+    .kpi {{ background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); padding: 1.2rem;
+            border-radius: 0.8rem; border-left: 4px solid #667eea; }}
+    .kpi .label {{ font-size: 0.9rem; }}
+    .kpi .value {{ font-size: 1.8rem; font-weight: 600; }}
+    .grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }}
+    table {{ border-collapse: collapse; }}
+    td, th {{ padding: 0.3rem 1rem; border-bottom: 1px solid #e2e8f0; text-align: left; }}
+</style>
+<script>{plotlyjs}</script>
+</head>
+<body>
+<h1>🏨 W Hotel 客戶評價分析 - {preset}</h1>
+<p class="meta">資料版本 {version} · {start} ~ {end} · 產生於 {generated}</p>
+<div class="kpis">{kpis}</div>
+<h3>📈 評價趨勢分析</h3>
+<div id="monthly"></div><div id="yearly"></div><div id="sentiment_trend"></div>
+<h3>🎯 各維度評分分析</h3>
+<div class="grid"><div id="dimensions"></div><div id="radar"></div></div>
+<h3>☁️ 評論關鍵詞</h3>
+<div class="grid"><div id="keywords"></div><div>{keywords}</div></div>
+<h3>📊 評價分布分析</h3>
+<div class="grid"><div id="star_dist"></div><div id="sentiment_dist"></div></div>
+<script type="application/json" id="snapshot-data">{data}</script>
+<script>
+    var snapshot = JSON.parse(document.getElementById('snapshot-data').textContent);
+    Object.keys(snapshot.figures).forEach(function (name) {{
+        var figure = snapshot.figures[name];
+        Plotly.newPlot(name, figure.data, figure.layout, {{responsive: true}});
+    }});
+</script>
+</body>
+</html>
+"""
+
+
+def snapshot_path(version, preset):
+    return os.path.join(SNAPSHOT_DIR, version, f"{PRESET_FILES[preset]}.html")
+
+
+def compute_snapshot(df, preset):
+    """以預設篩選計算快照內容（KPI 文字、圖表 JSON 與高頻詞）"""
+    min_date, max_date = df['date'].min().date(), df['date'].max().date()
+    start_date, end_date = preset_date_range(preset, min_date, max_date)
+    filtered_df = df[filter_mask(
+        df, start_date, end_date, sorted(df['star'].dropna().unique()), list(SENTIMENT_LABELS)
+    )]
+
+    kpis = compute_kpis(filtered_df)
+    dimension_df = compute_dimension_averages(filtered_df)
+    radar_df = dimension_df[dimension_df['平均分數'].notna()]
+    top_words = compute_word_freq(filtered_df['text'])
+    words_df = pd.DataFrame(list(top_words.items()), columns=['詞彙', '出現次數'])
+
+    figures = {
+        'monthly': monthly_trend_figure(compute_monthly_trend(filtered_df)),
+        'yearly': yearly_trend_figure(compute_yearly_trend(filtered_df)),
+        'sentiment_trend': sentiment_trend_figure(compute_sentiment_trend(filtered_df, SENTIMENT_LABELS)),
+        'dimensions': dimension_figure(dimension_df),
+        'star_dist': star_distribution_figure(filtered_df['star'].value_counts().sort_index()),
+        'sentiment_dist': sentiment_distribution_figure(filtered_df['sentiment'].value_counts(), SENTIMENT_LABELS)
+    }
+    if len(radar_df) > 0:
+        figures['radar'] = radar_figure(radar_df)
+    if len(words_df) > 0:
+        figures['keywords'] = word_freq_figure(words_df.sort_values('出現次數').tail(20), '全部')
+
+    return {
+        'preset': preset,
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'kpis': [
+            ('📝 總評論數', f"{kpis['total']:,}"),
+            ('⭐ 平均星級', f"{kpis['avg_star']:.2f}"),
+            ('😊 正面評價比例', f"{kpis['positive_pct']:.1f}%"),
+            ('😞 負面評價比例', f"{kpis['negative_pct']:.1f}%"),
+            ('📅 時間跨度', f"{kpis['date_span']} 天")
+        ],
+        'figures': {name: json.loads(figures[name].to_json()) for name in FIGURE_ORDER if name in figures},
+        'keywords': words_df.to_dict(orient='records')
+    }
+
+
+def render_snapshot(version, preset):
+    """產生單一時間快捷選項的快照 HTML 檔（先寫暫存檔再原子替換），回傳路徑"""
+    snapshot = compute_snapshot(open_shared(version)[1], preset)
+    snapshot.update(version=version, generated=datetime.now().isoformat(timespec='seconds'))
+
+    kpis = ''.join(
+        f'<div class="kpi"><div class="label">{html.escape(label)}</div>'
+        f'<div class="value">{html.escape(value)}</div></div>'
+        for label, value in snapshot['kpis']
+    )
+    keywords = pd.DataFrame(snapshot['keywords'], columns=['詞彙', '出現次數']).to_html(index=False)
+    page = _TEMPLATE.format(
+        preset=html.escape(preset),
+        version=version,
+        start=snapshot['start'],
+        end=snapshot['end'],
+        generated=snapshot['generated'].replace('T', ' '),
+        kpis=kpis,
+        keywords=keywords,
+        plotlyjs=get_plotlyjs(),
+        # 避免 JSON 中的 </script> 提前結束標籤
+        data=json.dumps(snapshot, ensure_ascii=False).replace('</', '<\\/')
+    )
+
+    path = snapshot_path(version, preset)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(page)
+    os.replace(tmp, path)
+    return path
+
+
+def build_snapshots(version, workers=1):
+    """為指定版本產生所有時間快捷選項的快照（已存在者略過），回傳產生的檔案路徑
+
+    workers > 1 時以 fork 程序池平行產生，只供命令列使用：儀表板伺服器是多執行緒的，
+    在其中 fork 可能因其他執行緒持有的鎖而卡住，因此儀表板一律逐一產生。
+    """
+    presets = [p for p in TIME_PRESETS if not os.path.exists(snapshot_path(version, p))]
+    if not presets:
+        return []
+    # 先在目前程序建立共用資料集，子程序只需 mmap 開啟
+    open_shared(version)
+
+    if workers == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [render_snapshot(version, preset) for preset in presets]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(presets)),
+        mp_context=multiprocessing.get_context('fork')
+    ) as pool:
+        return list(pool.map(render_snapshot, [version] * len(presets), presets))
+
+
+def load_snapshot(version, preset):
+    """讀取快照內嵌的 JSON；尚未產生時回傳 None"""
+    path = snapshot_path(version, preset)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        match = _DATA_PATTERN.search(f.read())
+    return json.loads(match.group(1)) if match else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='為目前的資料版本產生靜態報表快照')
+    parser.add_argument('--version', default=None, help='資料版本（預設為來源檔目前的版本）')
+    parser.add_argument('--workers', type=int, default=None, help='程序數（預設為 CPU 數）')
+    args = parser.parse_args()
+
+    version = args.version or current_version()
+    start = time.perf_counter()
+    paths = build_snapshots(version, workers=args.workers or os.cpu_count() or 1)
+    print(f"版本 {version}：產生 {len(paths)} 份快照，耗時 {time.perf_counter() - start:.1f} 秒")
+    for path in paths:
+        print(f"  {path}")
+
+
+if __name__ == '__main__':
+    main()
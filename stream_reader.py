@@ -0,0 +1,189 @@
+"""大型活頁簿的串流讀取：解析時不建立 openpyxl 的完整物件模型
+
+以 openpyxl 的 read_only / values_only 模式逐列讀取，每 CHUNK_ROWS 列轉成固定型別的
+Arrow record batch。解析本身的記憶體用量固定，但結果仍會合併成一份完整的 DataFrame，
+整體記憶體用量隨資料量成長。單一檔案以 read_workbook 在目前程序直接合併各 batch；
+多個檔案以 stream_workbooks 交給程序池平行解析，各自寫成 Arrow 暫存檔再以 read_parts 讀回。預設只讀每個檔案的第一個工作表（與 pandas.read_excel 相同），
+讀取多個工作表時需使用相同的標題列。無法轉型的值會設為缺值，並記錄在 _coerce_errors
+欄位，交由驗證階段隔離該列，而不是讓整個檔案載入失敗。每一列另附來源工作表與
+Excel 列號（_source_sheet / _source_row），供隔離檔指出原始位置。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+import pandas as pd
+import pyarrow as pa
+from openpyxl import load_workbook
+
+CHUNK_ROWS = 10000
+
+# 固定欄位型別：date 為時間、下列欄位為數值，其餘一律為文字
+DATE_COLUMNS = {'date'}
+NUMERIC_COLUMNS = {'Unnamed: 0', 'idx', 'sentiment', 'star'}
+NUMERIC_PREFIXES = ('r_sentiment.',)
+# 與 pandas.read_excel 預設相同，視為缺值的字串
+NA_STRINGS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+COERCE_ERRORS_COLUMN = '_coerce_errors'
+SOURCE_SHEET_COLUMN = '_source_sheet'
+SOURCE_ROW_COLUMN = '_source_row'
+# 附加在資料欄位之後的欄位（不是來源檔的內容）
+EXTRA_COLUMNS = [COERCE_ERRORS_COLUMN, SOURCE_SHEET_COLUMN, SOURCE_ROW_COLUMN]
+
+
+def _column_names(header):
+    # 與 pandas.read_excel 相同：空白標題命名為 Unnamed: i
+    return [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+
+
+def arrow_type(name):
+    """欄位名稱對應的固定 Arrow 型別"""
+    if name in DATE_COLUMNS:
+        return pa.timestamp('us')
+    if name in NUMERIC_COLUMNS or name.startswith(NUMERIC_PREFIXES):
+        return pa.float64()
+    return pa.large_string()
+
+
+def _to_batch(rows, schema, sheet_name, row_numbers):
+    """將一批列轉為固定型別的 Arrow record batch（最後三欄為轉型錯誤說明、來源工作表與列號）"""
+    columns = list(zip(*rows)) if rows else [()] * (len(schema) - len(EXTRA_COLUMNS))
+    arrays = []
+    errors = pd.Series('', index=range(len(rows)), dtype=object)
+    for field, values in zip(schema, columns):
+        raw = pd.Series(values, dtype=object)
+        if pa.types.is_timestamp(field.type):
+            series = pd.to_datetime(raw, errors='coerce').astype('datetime64[us]')
+        elif pa.types.is_floating(field.type):
+            series = pd.to_numeric(raw, errors='coerce').astype('float64')
+        else:
+            texts = [None if v is None else str(v) for v in values]
+            arrays.append(pa.array([None if t in NA_STRINGS else t for t in texts], type=field.type))
+            continue
+
+        # 原始值不是缺值、轉型後卻變成缺值 -> 記錄欄位與原始值
+        raw_text = raw.astype(str)
+        failed = series.isna() & raw.notna() & ~raw_text.isin(NA_STRINGS)
+        if failed.any():
+            errors[failed] += field.name + '=' + raw_text[failed] + '; '
+        arrays.append(pa.array(series, type=field.type, from_pandas=True))
+
+    arrays.append(pa.array(errors.where(errors != '', None).str.rstrip('; '), type=pa.large_string()))
+    arrays.append(pa.array([sheet_name] * len(rows), type=pa.large_string()))
+    arrays.append(pa.array(row_numbers, type=pa.int64()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_sheet_batches(path, sheet_name, chunk_rows=CHUNK_ROWS):
+    """串流解析一個工作表，逐批產生固定型別的 Arrow record batch；空白工作表不產生任何 batch"""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        names = _column_names(header)
+        schema = pa.schema(
+            [pa.field(name, arrow_type(name)) for name in names] +
+            [pa.field(COERCE_ERRORS_COLUMN, pa.large_string()),
+             pa.field(SOURCE_SHEET_COLUMN, pa.large_string()),
+             pa.field(SOURCE_ROW_COLUMN, pa.int64())]
+        )
+        chunk, row_numbers = [], []
+        # 標題列之後的 Excel 列號（空白列也要計入）
+        for row_number, row in enumerate(rows, start=(worksheet.min_row or 1) + 1):
+            # 略過完全空白的列（pandas.read_excel 會保留為全缺值的列，但這些列沒有內容，不需驗證或載入）
+            if all(v is None for v in row):
+                continue
+            chunk.append(row[:len(names)] + (None,) * (len(names) - len(row)))
+            row_numbers.append(row_number)
+            if len(chunk) >= chunk_rows:
+                yield _to_batch(chunk, schema, sheet_name, row_numbers)
+                chunk, row_numbers = [], []
+        if chunk:
+            yield _to_batch(chunk, schema, sheet_name, row_numbers)
+    finally:
+        workbook.close()
+
+
+def stream_sheet(path, sheet_name, output_path, chunk_rows=CHUNK_ROWS):
+    """串流解析一個工作表並寫成 Arrow IPC stream 檔（供程序池平行解析），回傳寫入的列數
+
+    沒有資料列的工作表不會產生檔案。
+    """
+    batches = iter_sheet_batches(path, sheet_name, chunk_rows)
+    first = next(batches, None)
+    if first is None:
+        return 0
+    total = 0
+    with pa.OSFile(output_path, 'wb') as sink, pa.ipc.new_stream(sink, first.schema) as writer:
+        for batch in chain([first], batches):
+            writer.write_batch(batch)
+            total += batch.num_rows
+    return total
+
+
+def _sheet_names(path):
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def stream_workbooks(paths, output_dir, workers=None, all_sheets=False):
+    """解析多個檔案（可平行），回傳依序排列、實際產生的 Arrow 暫存檔路徑
+
+    預設只解析每個檔案的第一個工作表；all_sheets=True 時解析所有工作表。
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    for file_index, path in enumerate(paths):
+        sheets = _sheet_names(path)
+        for sheet_index, sheet in enumerate(sheets if all_sheets else sheets[:1]):
+            part = os.path.join(output_dir, f"part-{file_index:04d}-{sheet_index:04d}.arrow")
+            tasks.append((path, sheet, part))
+
+    if len(tasks) <= 1 or workers == 1:
+        for task in tasks:
+            stream_sheet(*task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers or min(len(tasks), os.cpu_count())) as pool:
+            list(pool.map(stream_sheet, *zip(*tasks)))
+    # 沒有資料列的工作表不會產生暫存檔
+    return [part for _, _, part in tasks if os.path.exists(part)]
+
+
+def read_workbook(path, all_sheets=False, chunk_rows=CHUNK_ROWS):
+    """在目前程序串流解析單一檔案並直接合併為 DataFrame（不經暫存檔）
+
+    預設只解析第一個工作表；all_sheets=True 時解析所有工作表。
+    """
+    sheets = _sheet_names(path)
+    tables = []
+    for sheet in (sheets if all_sheets else sheets[:1]):
+        batches = list(iter_sheet_batches(path, sheet, chunk_rows))
+        if batches:
+            tables.append(pa.Table.from_batches(batches))
+    return _concat(tables)
+
+
+def read_parts(parts):
+    """讀回 Arrow 暫存檔並合併為 DataFrame"""
+    tables = []
+    for part in parts:
+        with pa.OSFile(part, 'rb') as source:
+            tables.append(pa.ipc.open_stream(source).read_all())
+    return _concat(tables)
+
+
+def _concat(tables):
+    tables = [table for table in tables if table.num_rows > 0]
+    if not tables:
+        return pd.DataFrame()
+    return pa.concat_tables(tables, promote_options='default').to_pandas()
@@ -0,0 +1,105 @@
+"""載入時的資料驗證與隔離：一次向量化檢查所有欄位，不合格的列移到隔離檔並附上原因"""
+import json
+import os
+import time
+
+import pandas as pd
+
+from analytics import DIMENSIONS
+from stream_reader import COERCE_ERRORS_COLUMN, EXTRA_COLUMNS, SOURCE_ROW_COLUMN, SOURCE_SHEET_COLUMN
+
+QUARANTINE_DIR = '.data_cache'
+
+ALLOWED_SENTIMENTS = [-1.0, 0.0, 1.0]
+ALLOWED_STARS = [1.0, 2.0, 3.0, 4.0, 5.0]
+MIN_DATE = pd.Timestamp('2000-01-01')
+
+
+def _rules(df):
+    """回傳 (規則名稱, 不合格遮罩) 列表；每條規則都是整欄的向量化運算"""
+    rules = []
+    if COERCE_ERRORS_COLUMN in df.columns:
+        rules.append(('型別錯誤', df[COERCE_ERRORS_COLUMN].notna()))
+
+    # 日期：必填且在合理範圍內
+    rules.append(('缺少日期', df['date'].isna()))
+    rules.append(('日期超出範圍', (df['date'] < MIN_DATE) | (df['date'] > pd.Timestamp.now())))
+
+    # 數值範圍與代碼
+    rules.append(('星級超出範圍', df['star'].notna() & ~df['star'].isin(ALLOWED_STARS)))
+    rules.append(('情感代碼錯誤', df['sentiment'].notna() & ~df['sentiment'].isin(ALLOWED_SENTIMENTS)))
+    dims = [c for c in DIMENSIONS if c in df.columns]
+    if dims:
+        scores = df[dims]
+        rules.append(('維度情感代碼錯誤', (scores.notna() & ~scores.isin(ALLOWED_SENTIMENTS)).any(axis=1)))
+
+    # 缺值組合：有分數就必須有評論文字與星級
+    has_scores = df['sentiment'].notna()
+    if dims:
+        rules.append(('有維度分數但缺少整體情感', df[dims].notna().any(axis=1) & ~has_scores))
+    rules.append(('有情感分數但缺少評論文字', has_scores & df['text'].isna()))
+    rules.append(('有評論文字但缺少星級', df['text'].notna() & df['star'].isna()))
+    return rules
+
+
+def validate_reviews(df):
+    """驗證資料，回傳 (合格資料, 隔離資料, 報告)"""
+    start = time.perf_counter()
+    reasons = pd.Series('', index=df.index, dtype=object)
+    counts = {}
+    for name, mask in _rules(df):
+        mask = mask.fillna(False).astype(bool)
+        counts[name] = int(mask.sum())
+        if not counts[name]:
+            continue
+        if name == '型別錯誤':
+            # 附上無法轉型的原始值，方便追查
+            reasons[mask] += name + '（' + df.loc[mask, COERCE_ERRORS_COLUMN].astype(object) + '）；'
+        else:
+            reasons[mask] += name + '；'
+
+    bad = reasons != ''
+
+    quarantined = df[bad].drop(columns=EXTRA_COLUMNS, errors='ignore')
+    # 來源工作表與 Excel 列號（串流讀取時記錄，略過的空白列不影響列號）
+    if SOURCE_ROW_COLUMN in df.columns:
+        quarantined.insert(0, '_excel_row', df.loc[bad, SOURCE_ROW_COLUMN])
+        quarantined.insert(0, '_sheet', df.loc[bad, SOURCE_SHEET_COLUMN])
+    else:
+        quarantined.insert(0, '_excel_row', quarantined.index + 2)
+    quarantined['_reasons'] = reasons[bad].str.rstrip('；')
+    valid = df[~bad].drop(columns=EXTRA_COLUMNS, errors='ignore').reset_index(drop=True)
+
+    report = {
+        'rows': int(len(df)),
+        'valid': int(len(valid)),
+        'quarantined': int(bad.sum()),
+        'rules': counts,
+        'seconds': round(time.perf_counter() - start, 4)
+    }
+    return valid, quarantined, report
+
+
+def quarantine_paths(version):
+    return (
+        os.path.join(QUARANTINE_DIR, f"quarantine-{version}.csv"),
+        os.path.join(QUARANTINE_DIR, f"validation-{version}.json")
+    )
+
+
+def write_quarantine(quarantined, report, version):
+    """寫出隔離檔（CSV）與驗證報告（JSON）"""
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+    csv_path, report_path = quarantine_paths(version)
+    quarantined.to_csv(csv_path, index=False, encoding='utf-8-sig')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(version):
+    """讀取驗證報告；尚未產生時回傳 None"""
+    _, report_path = quarantine_paths(version)
+    if not os.path.exists(report_path):
+        return None
+    with open(report_path, encoding='utf-8') as f:
+        return json.load(f)
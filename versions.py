@@ -0,0 +1,355 @@
+"""不可變的版本化資料集：只追加的欄式區段 + 每個版本一份清單（manifest）
+
+目錄結構（.dataset_versions/）：
+    segments/seg-<雜湊>.arrow    各版本新增或修改的列（寫入後不再變動）
+    deletes/del-<雜湊>.npy      區段中已被後續版本移除的列位置（刪除向量）
+    minhash/seg-<雜湊>.*.npy    區段各列的 MinHash 簽章與 LSH 分桶鍵（第一次需要時計算）
+    manifests/<版本>.json       該版本由哪些區段（扣除哪些列）組成
+    log.jsonl                   依時間追加的版本紀錄（含來源檔指紋與增刪改筆數）
+    commit.lock                 寫入版本時的檔案鎖（同時只有一個執行緒或程序載入來源檔）
+
+版本代碼是所有列 (識別碼, 內容雜湊) 的雜湊，內容相同就是同一個版本。來源檔更新時
+只把新增或修改的列寫成新區段，移除的列以刪除向量標記，不改寫任何既有檔案。
+
+    python versions.py list
+    python versions.py diff <舊版本> <新版本>
+"""
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from dataset import DATA_PATH, ROW_HASH_COLUMN, ROW_KEY_COLUMN, ingest_reviews, source_fingerprint
+from dedup import compute_minhash
+from stream_reader import arrow_type
+from validation import write_quarantine
+
+VERSIONS_DIR = '.dataset_versions'
+LOG_PATH = os.path.join(VERSIONS_DIR, 'log.jsonl')
+LOCK_PATH = os.path.join(VERSIONS_DIR, 'commit.lock')
+
+
+def _segment_path(name):
+    return os.path.join(VERSIONS_DIR, 'segments', name)
+
+
+def _delete_path(name):
+    return os.path.join(VERSIONS_DIR, 'deletes', name)
+
+
+def _minhash_path(name, part):
+    return os.path.join(VERSIONS_DIR, 'minhash', f"{name[:-len('.arrow')]}.{part}.npy")
+
+
+def _manifest_path(version):
+    return os.path.join(VERSIONS_DIR, 'manifests', f"{version}.json")
+
+
+def _atomic_write(path, write):
+    """先寫暫存檔再原子替換，多程序同時寫入同一個檔案也安全"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _digest(*arrays):
+    h = hashlib.sha1()
+    for array in arrays:
+        h.update(np.ascontiguousarray(array).tobytes())
+    return h.hexdigest()[:12]
+
+
+def read_log():
+    """所有版本紀錄（依寫入順序）"""
+    if not os.path.exists(LOG_PATH):
+        return []
+    with open(LOG_PATH, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def list_versions(records=None):
+    """各版本最後一筆紀錄，新版本在前（records 為已讀取的版本紀錄，省略時讀取 log）"""
+    latest = {}
+    for record in read_log() if records is None else records:
+        latest.pop(record['version'], None)
+        latest[record['version']] = record
+    return list(reversed(latest.values()))
+
+
+def _logged_version(records, path, fingerprint):
+    """已寫入過的同一份來源（路徑與指紋相同）對應的版本；沒有時回傳 None"""
+    for record in reversed(records):
+        if record['source'] == {'path': path, 'fingerprint': fingerprint}:
+            return record['version']
+    return None
+
+
+def current_version(path=DATA_PATH, records=None):
+    """來源檔目前內容對應的版本；來源檔有變更時先載入並寫入新版本
+
+    records 為已讀取的版本紀錄（省略時讀取 log）。
+    """
+    records = read_log() if records is None else records
+    return _logged_version(records, path, source_fingerprint(path)) or commit_source(path)
+
+
+@contextmanager
+def _commit_lock():
+    """跨執行緒與程序的排他鎖（flock 以開啟的檔案為單位，同一程序的不同執行緒也會互斥）"""
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    with open(LOCK_PATH, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def commit_source(path=DATA_PATH):
+    """載入來源檔並寫入版本，回傳版本代碼；同一份來源已寫入過時直接回傳該版本"""
+    with _commit_lock():
+        # 等待鎖的期間，其他執行緒或程序可能已寫入同一份來源
+        fingerprint = source_fingerprint(path)
+        records = read_log()
+        version = _logged_version(records, path, fingerprint)
+        if version is not None:
+            return version
+
+        df, quarantined, report = ingest_reviews(path)
+        versions = list_versions(records)
+        version = commit(df, {'path': path, 'fingerprint': fingerprint}, versions[0]['version'] if versions else None)
+        write_quarantine(quarantined, report, version)
+        return version
+
+
+def _to_segment_table(df):
+    """固定欄位型別（與串流讀取相同），不同時間寫入的區段才能直接合併"""
+    arrays, fields = [], []
+    for col in df.columns:
+        series = df[col]
+        if col in (ROW_KEY_COLUMN, ROW_HASH_COLUMN):
+            array = pa.array(series.to_numpy(), type=pa.uint64())
+        elif pd.api.types.is_bool_dtype(series):
+            array = pa.array(series.to_numpy(), type=pa.bool_())
+        elif pa.types.is_large_string(arrow_type(col)):
+            array = pa.array(series.astype(object), type=pa.large_string(), from_pandas=True)
+        else:
+            array = pa.array(series, type=arrow_type(col), from_pandas=True)
+        arrays.append(array)
+        fields.append(pa.field(col, array.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _write_segment(df):
+    name = f"seg-{_digest(df[ROW_KEY_COLUMN].to_numpy(), df[ROW_HASH_COLUMN].to_numpy())}.arrow"
+    path = _segment_path(name)
+    if not os.path.exists(path):
+        table = _to_segment_table(df)
+
+        def write(tmp):
+            with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        _atomic_write(path, write)
+    return name
+
+
+def _write_deletes(positions):
+    positions = np.unique(positions).astype(np.int64)
+    name = f"del-{_digest(positions)}.npy"
+    path = _delete_path(name)
+    if not os.path.exists(path):
+        def write(tmp):
+            with open(tmp, 'wb') as f:
+                np.save(f, positions)
+        _atomic_write(path, write)
+    return name
+
+
+def _read_segment(name, columns=None):
+    with pa.memory_map(_segment_path(name), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def _live_positions(segment):
+    """區段中此版本仍存在的列位置"""
+    rows = segment['rows']
+    if not segment['deletes']:
+        return np.arange(rows)
+    deleted = np.load(_delete_path(segment['deletes']))
+    return np.setdiff1d(np.arange(rows), deleted, assume_unique=True)
+
+
+def read_manifest(version):
+    with open(_manifest_path(version), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _live_index(manifest):
+    """版本中每一列的 (識別碼, 內容雜湊, 區段序號, 區段內位置)，只讀取這兩個欄位"""
+    parts = []
+    for i, segment in enumerate(manifest['segments']):
+        positions = _live_positions(segment)
+        table = _read_segment(segment['file'], [ROW_KEY_COLUMN, ROW_HASH_COLUMN]).take(positions)
+        parts.append(pd.DataFrame({
+            ROW_KEY_COLUMN: table.column(ROW_KEY_COLUMN).to_numpy(),
+            ROW_HASH_COLUMN: table.column(ROW_HASH_COLUMN).to_numpy(),
+            'segment': i,
+            'position': positions
+        }))
+    if not parts:
+        empty = np.array([], dtype=np.uint64)
+        return pd.DataFrame({ROW_KEY_COLUMN: empty, ROW_HASH_COLUMN: empty, 'segment': [], 'position': []})
+    return pd.concat(parts, ignore_index=True)
+
+
+def _change_counts(old_index, new_index):
+    """依識別碼比較兩個版本，回傳 (新增, 移除, 修改) 的識別碼"""
+    old = old_index.set_index(ROW_KEY_COLUMN)[ROW_HASH_COLUMN]
+    new = new_index.set_index(ROW_KEY_COLUMN)[ROW_HASH_COLUMN]
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+    changed = common[new[common].to_numpy() != old[common].to_numpy()]
+    return added, removed, changed
+
+
+def commit(df, source, parent=None):
+    """寫入一個版本（只追加新增或修改的列），回傳版本代碼"""
+    order = np.lexsort((df[ROW_HASH_COLUMN].to_numpy(), df[ROW_KEY_COLUMN].to_numpy()))
+    version = _digest(df[ROW_KEY_COLUMN].to_numpy()[order], df[ROW_HASH_COLUMN].to_numpy()[order])
+
+    record = {'version': version, 'parent': parent, 'created': datetime.now().isoformat(timespec='seconds'),
+              'source': source, 'rows': int(len(df))}
+    if not os.path.exists(_manifest_path(version)):
+        parent_manifest = read_manifest(parent) if parent else {'segments': []}
+        parent_index = _live_index(parent_manifest)
+        pairs = [ROW_KEY_COLUMN, ROW_HASH_COLUMN]
+
+        # 上一版沒有的 (識別碼, 內容) -> 新區段；這一版沒有的 -> 刪除向量
+        merged = df[pairs].merge(parent_index, on=pairs, how='left', indicator=True)
+        new_rows = df[(merged['_merge'] == 'left_only').to_numpy()]
+        gone = parent_index.merge(df[pairs], on=pairs, how='left', indicator=True)
+        gone = parent_index[(gone['_merge'] == 'left_only').to_numpy()]
+
+        segments = []
+        for i, segment in enumerate(parent_manifest['segments']):
+            removed = gone.loc[gone['segment'] == i, 'position'].to_numpy()
+            if len(removed):
+                if segment['deletes']:
+                    removed = np.concatenate([np.load(_delete_path(segment['deletes'])), removed])
+                segment = dict(segment, deletes=_write_deletes(removed))
+            segments.append(segment)
+        if len(new_rows):
+            segments.append({'file': _write_segment(new_rows), 'rows': int(len(new_rows)), 'deletes': None})
+
+        added, removed, changed = _change_counts(parent_index, df[pairs])
+        record.update(added=len(added), removed=len(removed), changed=len(changed))
+        manifest = dict(record, segments=segments)
+
+        def write(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+        _atomic_write(_manifest_path(version), write)
+    else:
+        # 內容相同（例如來源檔只是被重新存檔）：沿用既有版本，只記錄新的來源指紋
+        manifest = read_manifest(version)
+        record.update({k: manifest[k] for k in ('parent', 'added', 'removed', 'changed')})
+
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    with open(LOG_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return version
+
+
+def load_version(version):
+    """讀回某個版本的資料（尚未加上年月、評論者等衍生欄位）"""
+    tables = []
+    for segment in read_manifest(version)['segments']:
+        table = _read_segment(segment['file']).take(_live_positions(segment))
+        if table.num_rows > 0:
+            tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    return pa.concat_tables(tables, promote_options='default').to_pandas()
+
+
+def _segment_minhash(name):
+    """區段的 MinHash 資料（以 mmap 開啟）；區段不可變，只在第一次需要時計算"""
+    parts = ('signatures', 'valid', 'bands')
+    if not all(os.path.exists(_minhash_path(name, part)) for part in parts):
+        texts = _read_segment(name, ['text']).column('text').to_pylist()
+        for part, values in compute_minhash(texts).items():
+            def write(tmp):
+                with open(tmp, 'wb') as f:
+                    np.save(f, values)
+            _atomic_write(_minhash_path(name, part), write)
+    return {part: np.load(_minhash_path(name, part), mmap_mode='r') for part in parts}
+
+
+def load_version_minhash(version):
+    """與 load_version 各列對齊的 MinHash 資料；只有尚未計算過的區段需要重新雜湊"""
+    parts = {'signatures': [], 'valid': [], 'bands': []}
+    for segment in read_manifest(version)['segments']:
+        positions = _live_positions(segment)
+        minhash = _segment_minhash(segment['file'])
+        for part in parts:
+            parts[part].append(minhash[part][positions])
+    if not parts['valid']:
+        return compute_minhash([])
+    return {part: np.concatenate(values) for part, values in parts.items()}
+
+
+def diff_versions(old_version, new_version):
+    """比較兩個版本，回傳 {'added', 'removed', 'changed'}；changed 附上 _changed_columns 欄位"""
+    old = load_version(old_version).set_index(ROW_KEY_COLUMN)
+    new = load_version(new_version).set_index(ROW_KEY_COLUMN)
+    added, removed, changed = _change_counts(old.reset_index(), new.reset_index())
+
+    columns = [c for c in new.columns if c in old.columns and c != ROW_HASH_COLUMN]
+    before, after = old.loc[changed, columns], new.loc[changed, columns]
+    differs = (before != after) & ~(before.isna() & after.isna())
+    changed_df = new.loc[changed].copy()
+    changed_df['_changed_columns'] = [
+        '、'.join(c for c, d in zip(columns, row) if d) for row in differs.to_numpy()
+    ]
+    return {
+        'added': new.loc[added].reset_index(),
+        'removed': old.loc[removed].reset_index(),
+        'changed': changed_df.reset_index()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='版本化資料集：列出版本或比較兩個版本')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='列出所有版本')
+    diff_parser = sub.add_parser('diff', help='比較兩個版本')
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        current_version()
+        for record in list_versions():
+            print(f"{record['version']}  {record['created']}  {record['rows']:,} 筆  "
+                  f"+{record.get('added', 0)} -{record.get('removed', 0)} ~{record.get('changed', 0)}  "
+                  f"{record['source']['path']}")
+    else:
+        diff = diff_versions(args.old, args.new)
+        for name, label in [('added', '新增'), ('removed', '移除'), ('changed', '修改')]:
+            print(f"{label}: {len(diff[name]):,} 筆")
+        for _, row in diff['changed'].head(20).iterrows():
+            print(f"  {row['date']:%Y-%m-%d} {row['name']}：{row['_changed_columns']}")
+
+
+if __name__ == '__main__':
+    main()